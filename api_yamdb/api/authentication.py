@@ -0,0 +1,92 @@
+from time import monotonic
+
+from django.db.models.signals import post_delete, post_save
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+# Поля пользователя, которые записываются в токен и нужны правам доступа.
+TOKEN_USER_FIELDS = ('role', 'is_staff', 'is_superuser')
+
+# Время жизни закешированного состояния пользователя: смена роли или
+# блокировка в другом процессе отзовёт токены не позже этого интервала.
+AUTH_STATE_CACHE_TIMEOUT = 60
+AUTH_STATE_CACHE_SIZE = 10000
+
+_auth_state_cache = {}
+
+
+def access_token_for_user(user):
+    """Access-токен с ролью и флагами пользователя в claims."""
+    token = AccessToken.for_user(user)
+    for field in TOKEN_USER_FIELDS:
+        token[field] = getattr(user, field)
+    return token
+
+
+def get_auth_state(user_id):
+    """Имя, роль и флаги пользователя из кеша процесса или из базы.
+
+    None, если пользователь удалён или заблокирован.
+    """
+    cached = _auth_state_cache.get(user_id)
+    if cached is None or monotonic() - cached[0] > AUTH_STATE_CACHE_TIMEOUT:
+        if len(_auth_state_cache) >= AUTH_STATE_CACHE_SIZE:
+            _auth_state_cache.clear()
+        state = User.objects.filter(
+            pk=user_id, is_active=True
+        ).values_list('username', *TOKEN_USER_FIELDS).first()
+        cached = (monotonic(), state)
+        _auth_state_cache[user_id] = cached
+    return cached[1]
+
+
+def invalidate_auth_state(sender, instance, **kwargs):
+    _auth_state_cache.pop(instance.pk, None)
+
+
+post_save.connect(invalidate_auth_state, sender=User)
+post_delete.connect(invalidate_auth_state, sender=User)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без чтения пользователя из базы на каждый запрос.
+
+    Пользователь собирается из claims токена, выданного
+    access_token_for_user(). Токен отзывается, если пользователь удалён,
+    заблокирован или его роль и флаги отличаются от записанных в токене;
+    состояние пользователя кешируется в памяти процесса. Токены без роли
+    в claims проверяются стандартным способом.
+    """
+
+    def get_user(self, validated_token):
+        required = (api_settings.USER_ID_CLAIM, *TOKEN_USER_FIELDS)
+        if any(claim not in validated_token for claim in required):
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        claims = tuple(validated_token[field] for field in TOKEN_USER_FIELDS)
+        state = get_auth_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден или заблокирован.',
+                code='user_not_found'
+            )
+        username, *current = state
+        if tuple(current) != claims:
+            raise AuthenticationFailed(
+                'Роль пользователя изменилась, получите новый токен.',
+                code='token_not_valid'
+            )
+        user = User(
+            pk=user_id, username=username, is_active=True,
+            **dict(zip(TOKEN_USER_FIELDS, claims))
+        )
+        # Экземпляр считается сохранённым: его можно указывать автором
+        # отзыва или комментария. Остальные поля не загружены, поэтому
+        # для изменения профиля пользователь читается из базы.
+        user._state.adding = False
+        user._state.db = User.objects.db
+        return user
@@ -0,0 +1,431 @@
+"""Нагрузочные сценарии для запросов к API внутри процесса."""
+import tracemalloc
+from contextlib import contextmanager
+from itertools import count
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import URLResolver, get_resolver, resolve
+
+from api.authentication import access_token_for_user
+from api.throttling import TokenBucketThrottle
+from api_yamdb.middleware import timing_logger
+from reviews.models import (
+    ROLE_ADMIN, ROLE_USER, Category, Genre, Review, Title, User
+)
+
+# Бюджеты по умолчанию: число SQL-запросов и p95 в миллисекундах.
+DEFAULT_BUDGET = {'queries': 2, 'p95_ms': 50}
+# Страница из ста произведений с жанрами и категорией.
+TITLES_PAGE_BUDGET = {'queries': 3, 'p95_ms': 300}
+# Запросы управления транзакцией не выполняются в рабочем режиме: сценарии
+# с записью оборачиваются в транзакцию, которая затем откатывается.
+TRANSACTION_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO')
+# Ставка, при которой ограничение частоты работает, но не срабатывает.
+BENCHMARK_THROTTLE_RATE = '1000000/s'
+
+
+class Scenario:
+    """Запрос к API с бюджетом запросов к базе и задержки.
+
+    Сценарии с записью (write=True) выполняются в откатываемой
+    транзакции, поэтому данные между повторами не меняются. data может
+    быть функцией от номера повтора.
+    """
+
+    def __init__(self, name, method, url, client='anonymous', data=None,
+                 write=False, **budget):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.client = client
+        self.data = data
+        self.write = write
+        self.budget = {**DEFAULT_BUDGET, **budget}
+
+    def request(self, clients, number):
+        data = self.data(number) if callable(self.data) else self.data
+        client = clients[self.client]
+        if self.method == 'get':
+            return client.get(self.url, data)
+        return getattr(client, self.method)(
+            self.url, data, content_type='application/json'
+        )
+
+
+def sample_objects():
+    """Объекты с наибольшим количеством связанных записей."""
+    title = Title.objects.order_by('-reviews_count').first()
+    review = Review.objects.filter(title=title).annotate(
+        comments_count=Count('comments')
+    ).order_by('-comments_count').first() if title else None
+    user = User.objects.filter(role=ROLE_USER).order_by('pk').first()
+    return {
+        'title': title,
+        'review': review,
+        'category': Category.objects.order_by('pk').first(),
+        'genre': Genre.objects.order_by('pk').first(),
+        'admin': User.objects.filter(role=ROLE_ADMIN).order_by('pk').first(),
+        'user': user,
+        # Произведение, на которое user ещё не писал отзыв.
+        'free_title': Title.objects.exclude(
+            reviews__author=user
+        ).order_by('-reviews_count').first() if user else None,
+    }
+
+
+def create_missing_accounts():
+    """Создаёт администратора и пользователя, если таких ролей в базе нет.
+
+    Вызывается в транзакции benchmark_api, которая затем откатывается.
+    """
+    for role in (ROLE_ADMIN, ROLE_USER):
+        if not User.objects.filter(role=role).exists():
+            User.objects.create(
+                username=f'benchmark_{role}',
+                email=f'benchmark_{role}@yamdb.fake', role=role,
+            )
+
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def build_scenarios(objects):
+    """Сценарии для всех маршрутов api/urls.py на данных из базы.
+
+    Сценарии, для которых в базе нет данных, пропускаются; benchmark_api
+    считает такие маршруты ошибкой.
+    """
+    return (
+        read_scenarios(objects) + user_scenarios(objects)
+        + admin_scenarios(objects)
+    )
+
+
+def review_url(review):
+    return f'{TITLES_URL}{review.title_id}/reviews/{review.pk}/'
+
+
+def read_scenarios(objects):
+    title, review = objects['title'], objects['review']
+    category, genre = objects['category'], objects['genre']
+    titles = TITLES_URL
+    scenarios = [
+        Scenario('api-root', 'get', '/api/v1/', queries=0),
+        Scenario('categories-list', 'get', '/api/v1/categories/'),
+        Scenario('genres-list', 'get', '/api/v1/genres/'),
+        Scenario('titles-facets', 'get', f'{titles}facets/', queries=3,
+                 p95_ms=150),
+        Scenario(
+            'signup', 'post', '/api/v1/auth/signup/', write=True,
+            data=lambda number: {
+                'username': f'benchmark{number}',
+                'email': f'benchmark{number}@yamdb.fake',
+            },
+            queries=4,
+        ),
+    ]
+    title_filters = {
+        '': '',
+        'ordering=name': 'ordering=name',
+        'ordering=-year': 'ordering=-year',
+        'cursor': 'cursor=',
+        'search': 'search=город',
+    }
+    if category:
+        title_filters['category'] = f'category={category.slug}'
+    if genre:
+        title_filters['genre'] = f'genre={genre.slug}'
+    if title:
+        title_filters['year'] = f'year={title.year}'
+    scenarios += [
+        Scenario(
+            f'titles-list {name}'.strip(), 'get',
+            f'{titles}?{query}' if query else titles,
+            **TITLES_PAGE_BUDGET
+        )
+        for name, query in title_filters.items()
+    ]
+    if title:
+        title_url = f'{titles}{title.pk}/'
+        scenarios += [
+            Scenario('titles-detail', 'get', title_url, queries=3),
+            Scenario('reviews-list', 'get', f'{title_url}reviews/',
+                     queries=3),
+        ]
+    if review:
+        url = review_url(review)
+        scenarios += [
+            Scenario('reviews-detail', 'get', url),
+            Scenario('comments-list', 'get', f'{url}comments/'),
+        ]
+        comment = review.comments.order_by('pk').first()
+        if comment:
+            scenarios.append(Scenario(
+                'comments-detail', 'get', f'{url}comments/{comment.pk}/'
+            ))
+    return scenarios
+
+
+def user_scenarios(objects):
+    user, review = objects['user'], objects['review']
+    if not user:
+        return []
+    scenarios = [
+        Scenario('users-me', 'get', '/api/v1/users/me/', 'user', queries=1),
+        Scenario(
+            'token', 'post', '/api/v1/auth/token/', write=True,
+            data={
+                'username': user.username,
+                'confirmation_code': default_token_generator.make_token(
+                    user
+                ),
+            },
+        ),
+    ]
+    if objects['free_title']:
+        scenarios.append(Scenario(
+            'reviews-create', 'post',
+            f'{TITLES_URL}{objects["free_title"].pk}/reviews/', 'user',
+            write=True, data={'text': 'Отлично', 'score': 9}, queries=4,
+        ))
+    if review:
+        scenarios.append(Scenario(
+            'comments-create', 'post', f'{review_url(review)}comments/',
+            'user', write=True, data={'text': 'Согласен'}, queries=4,
+        ))
+    return scenarios
+
+
+def admin_scenarios(objects):
+    title, review = objects['title'], objects['review']
+    category, genre = objects['category'], objects['genre']
+    admin, titles = objects['admin'], TITLES_URL
+    if not admin:
+        return []
+    scenarios = [
+        Scenario('users-list', 'get', '/api/v1/users/', 'admin'),
+        Scenario(
+            'users-detail', 'get', f'/api/v1/users/{admin.username}/',
+            'admin', queries=1
+        ),
+        Scenario(
+            'users-create', 'post', '/api/v1/users/', 'admin',
+            write=True, data=lambda number: {
+                'username': f'benchmark_admin{number}',
+                'email': f'benchmark_admin{number}@yamdb.fake',
+            },
+            queries=4,
+        ),
+    ]
+    for resource, name in (('categories', 'Категория'), ('genres', 'Жанр')):
+        scenarios.append(Scenario(
+            f'{resource}-create', 'post', f'/api/v1/{resource}/',
+            'admin', write=True, data=lambda number, name=name: {
+                'name': name, 'slug': f'benchmark-{number}'
+            },
+            queries=3,
+        ))
+    # Удаление категории и жанра обновляет все связанные произведения,
+    # поэтому затраты зависят от объёма данных и не ограничиваются.
+    for resource, instance in (('categories', category), ('genres', genre)):
+        if instance:
+            scenarios.append(Scenario(
+                f'{resource}-delete', 'delete',
+                f'/api/v1/{resource}/{instance.slug}/', 'admin',
+                write=True, queries=None, p95_ms=None,
+            ))
+    if title:
+        scenarios += [
+            Scenario(
+                'titles-create', 'post', titles, 'admin', write=True,
+                data={
+                    'name': 'Новое произведение', 'year': 2000,
+                    'genre': [genre.slug] if genre else [],
+                    'category': category.slug if category else None,
+                },
+                queries=8,
+            ),
+            Scenario(
+                'titles-update', 'patch', f'{titles}{title.pk}/',
+                'admin', write=True, data={'name': 'Новое название'},
+                queries=5,
+            ),
+        ]
+    if review:
+        scenarios.append(Scenario(
+            'reviews-update', 'patch', review_url(review), 'admin', write=True,
+            data={'text': 'Новый текст'}, queries=5,
+        ))
+    return scenarios
+
+
+def api_route_names():
+    """Имена маршрутов из api/urls.py без суффиксов формата."""
+    resolver = get_resolver()
+    api_names = set()
+
+    def collect(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                collect(pattern.url_patterns)
+            elif pattern.name:
+                api_names.add(pattern.name)
+
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver) and pattern.namespace == 'api':
+            collect(pattern.url_patterns)
+    return api_names
+
+
+def scenario_route(scenario):
+    return resolve(scenario.url.split('?')[0]).url_name
+
+
+def percentile(values, percent):
+    """Значение перцентиля методом ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[int(index)]
+
+
+@contextmanager
+def query_counter():
+    """Считает SQL-запросы без журнала запросов DEBUG."""
+    queries = [0]
+
+    def wrapper(execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            queries[0] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield queries
+
+
+@contextmanager
+def benchmark_environment(use_cache=False, full_middleware=False,
+                          json_backend=None):
+    """Настройки для измерений: без DEBUG, без срабатывания лимитов, без
+    строк журнала api_yamdb.timing и, если use_cache не задан, без кеша
+    ответов. full_middleware
+    пропускает запросы к API через BROWSER_MIDDLEWARE, json_backend
+    заменяет API_JSON_BACKEND."""
+    overrides = {'DEBUG': False}
+    if full_middleware:
+        overrides['LEAN_MIDDLEWARE_PATHS'] = ()
+    if json_backend:
+        overrides['API_JSON_BACKEND'] = json_backend
+    if not use_cache:
+        overrides['CACHES'] = {
+            alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+            for alias in settings.CACHES
+        }
+    rates = TokenBucketThrottle.THROTTLE_RATES
+    saved_rates = dict(rates)
+    rates.update(
+        {scope: BENCHMARK_THROTTLE_RATE for scope in rates if rates[scope]}
+    )
+    logger_disabled = timing_logger.disabled
+    timing_logger.disabled = True
+    try:
+        with override_settings(**overrides):
+            yield
+    finally:
+        rates.clear()
+        rates.update(saved_rates)
+        timing_logger.disabled = logger_disabled
+
+
+def make_clients(objects):
+    clients = {'anonymous': Client()}
+    for role in ('user', 'admin'):
+        if objects[role]:
+            clients[role] = Client(
+                HTTP_AUTHORIZATION=(
+                    f'Bearer {access_token_for_user(objects[role])}'
+                )
+            )
+    return clients
+
+
+def run_once(scenario, clients, number):
+    """Выполняет сценарий; возвращает ответ, время в секундах и запросы."""
+    with query_counter() as queries:
+        if scenario.write:
+            with transaction.atomic():
+                started = perf_counter()
+                response = scenario.request(clients, number)
+                elapsed = perf_counter() - started
+                transaction.set_rollback(True)
+        else:
+            started = perf_counter()
+            response = scenario.request(clients, number)
+            elapsed = perf_counter() - started
+    return response, elapsed, queries[0]
+
+
+def measure(scenario, clients, iterations, warmup, traced=3):
+    """Задержки, запросы и выделенная память для сценария."""
+    numbers = count()
+    for _ in range(warmup):
+        run_once(scenario, clients, next(numbers))
+    timings = []
+    query_counts = []
+    for _ in range(iterations):
+        response, elapsed, queries = run_once(
+            scenario, clients, next(numbers)
+        )
+        timings.append(elapsed * 1000)
+        query_counts.append(queries)
+    # Трассировка памяти замедляет запросы, поэтому память измеряется
+    # отдельными прогонами.
+    allocated = []
+    for _ in range(traced):
+        tracemalloc.start()
+        try:
+            run_once(scenario, clients, next(numbers))
+            allocated.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    result = {
+        'name': scenario.name,
+        'route': scenario_route(scenario),
+        'method': scenario.method.upper(),
+        'url': scenario.url,
+        'status': response.status_code,
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'queries': max(query_counts),
+        'peak_bytes': percentile(allocated, 50),
+        'response_bytes': len(response.content),
+        'budget': scenario.budget,
+    }
+    return result
+
+
+def budget_failures(result, budget, latency_factor=1):
+    failures = []
+    if result['status'] >= 400:
+        failures.append(f'статус {result["status"]}')
+    if budget['queries'] is not None and result['queries'] > budget[
+        'queries'
+    ]:
+        failures.append(
+            f'запросов {result["queries"]} > {budget["queries"]}'
+        )
+    if budget['p95_ms'] is not None and result['p95_ms'] > (
+        budget['p95_ms'] * latency_factor
+    ):
+        failures.append(
+            f'p95 {result["p95_ms"]} мс > '
+            f'{budget["p95_ms"] * latency_factor} мс'
+        )
+    return failures
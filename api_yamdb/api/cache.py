@@ -0,0 +1,166 @@
+from calendar import timegm
+from hashlib import md5
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from reviews.models import Category, Genre, Review, Title
+
+# Версия ресурса меняется при любой записи в соответствующую модель.
+# Версии хранятся в том же кеше, что и ответы, поэтому при общем для
+# процессов бэкенде (файловый кеш, в т.ч. в /dev/shm) инвалидация видна
+# всем воркерам.
+VERSIONED_MODELS = {
+    Title: 'title',
+    Review: 'review',
+    Category: 'category',
+    Genre: 'genre',
+}
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def version_key(resource):
+    return f'api:version:{resource}'
+
+
+def get_versions(resources):
+    cache = get_cache()
+    keys = [version_key(resource) for resource in resources]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Новая версия не должна совпасть с вытесненной из кеша.
+            cache.add(key, time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*resources):
+    cache = get_cache()
+    for resource in resources:
+        key = version_key(resource)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time_ns(), timeout=None)
+
+
+def bump_model_version(sender, **kwargs):
+    resource = VERSIONED_MODELS[sender]
+    # Читатель не должен успеть закешировать ещё не зафиксированные данные
+    # под новой версией.
+    transaction.on_commit(lambda: bump_versions(resource))
+
+
+def bump_title_genre_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        transaction.on_commit(lambda: bump_versions('title'))
+
+
+def connect_signals():
+    for model in VERSIONED_MODELS:
+        post_save.connect(bump_model_version, sender=model)
+        post_delete.connect(bump_model_version, sender=model)
+    m2m_changed.connect(
+        bump_title_genre_version, sender=Title.genre.through
+    )
+
+
+def normalized_uri(request):
+    # Ссылки пагинации абсолютные, поэтому адрес тоже входит в ключ.
+    return request.build_absolute_uri(request.path) + '?' + '&'.join(
+        f'{name}={value}'
+        for name, values in sorted(request.query_params.lists())
+        for value in values
+    )
+
+
+def response_cache_key(request, prefix, resources):
+    versions = '.'.join(str(version) for version in get_versions(resources))
+    digest = md5(normalized_uri(request).encode('utf-8')).hexdigest()
+    return f'api:response:{prefix}:{versions}:{digest}'
+
+
+def cached_response(request, prefix, resources, handler):
+    """Отдаёт данные ответа handler() из кеша или кеширует их."""
+    cache = get_cache()
+    key = response_cache_key(request, prefix, resources)
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+    response = handler()
+    if response.status_code == 200:
+        cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+    return response
+
+
+class CachedListMixin:
+    """Кеширует данные ответа list с учётом версий ресурсов.
+
+    Ключ строится из нормализованной строки запроса и текущих версий
+    моделей из cache_dependencies.
+    """
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            request, self.basename, self.cache_dependencies,
+            lambda: super(CachedListMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для list и retrieve по отметке изменения.
+
+    get_change_marker() возвращает пару (версия, дата изменения) или None,
+    если условный ответ невозможен. При совпадении If-None-Match или
+    If-Modified-Since возвращается 304 без выполнения запроса к списку.
+    """
+
+    def get_change_marker(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        marker = self.get_change_marker()
+        if marker is None:
+            return handler(request, *args, **kwargs)
+        version, changed_at = marker
+        source = (
+            f'{version}:{self.action}:{request.accepted_renderer.format}:'
+            f'{normalized_uri(request)}'
+        )
+        etag = f'W/"{md5(source.encode("utf-8")).hexdigest()}"'
+        last_modified = (
+            timegm(changed_at.utctimetuple()) if changed_at else None
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -1,12 +1,77 @@
+from time import monotonic
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
 from django_filters import AllValuesFilter, CharFilter, FilterSet
+from django_filters.constants import EMPTY_VALUES
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from reviews.models import Category, Genre, Title
+from reviews.search import (
+    TITLE_FTS_TABLE, MatchingRowids, build_match_query
+)
+
+# Время жизни закешированных вариантов: изменения, сделанные в других
+# процессах, станут видны не позже чем через этот интервал.
+CHOICES_CACHE_TIMEOUT = 60
+
+_choices_cache = {}
+
+
+class CachedAllValuesFilter(AllValuesFilter):
+    """AllValuesFilter, берущий варианты из таблицы связанной модели.
+
+    Вместо SELECT DISTINCT по соединению с произведениями на каждый
+    запрос варианты читаются один раз и хранятся в памяти процесса до
+    изменения связанной модели.
+    """
+
+    @property
+    def field(self):
+        relation, field_name = self.field_name.split('__', 1)
+        related_model = self.model._meta.get_field(relation).related_model
+        key = (related_model._meta.label, field_name)
+        cached = _choices_cache.get(key)
+        if cached is None or monotonic() - cached[0] > CHOICES_CACHE_TIMEOUT:
+            values = related_model._default_manager.order_by(
+                field_name
+            ).values_list(field_name, flat=True)
+            cached = (monotonic(), [(value, value) for value in values])
+            _choices_cache[key] = cached
+        self.extra['choices'] = cached[1]
+        return super(AllValuesFilter, self).field
+
+    def filter(self, qs, value):
+        relation, field_name = self.field_name.split('__', 1)
+        field = self.model._meta.get_field(relation)
+        if value in EMPTY_VALUES or not field.many_to_many:
+            return super().filter(qs, value)
+        # Для связи многие-ко-многим фильтруем подзапросом к промежуточной
+        # таблице: соединение не размножает строки произведений и не
+        # смешивается с сортировкой и подсчётом.
+        links = field.remote_field.through._default_manager.filter(**{
+            f'{field.m2m_reverse_field_name()}__{field_name}': value
+        }).values(f'{field.m2m_field_name()}_id')
+        return qs.filter(pk__in=links)
 
-from reviews.models import Title
+
+def invalidate_choices(sender, **kwargs):
+    for key in [key for key in _choices_cache
+                if key[0] == sender._meta.label]:
+        _choices_cache.pop(key, None)
+
+
+for model in (Category, Genre):
+    post_save.connect(invalidate_choices, sender=model)
+    post_delete.connect(invalidate_choices, sender=model)
 
 
 class TitleFilter(FilterSet):
 
-    genre = AllValuesFilter(field_name='genre__slug')
-    category = AllValuesFilter(field_name='category__slug')
+    genre = CachedAllValuesFilter(field_name='genre__slug')
+    category = CachedAllValuesFilter(field_name='category__slug')
     name = CharFilter(lookup_expr='icontains')
 
     class Meta:
@@ -17,3 +82,53 @@ class TitleFilter(FilterSet):
             'name',
             'year',
         ]
+
+
+class TitleSearchFilter(SearchFilter):
+    """Полнотекстовый поиск по названию и описанию через индекс FTS5.
+
+    Без явного `ordering` (и вне курсорного режима) результаты
+    сортируются по релевантности bm25.
+    """
+    search_description = 'Поиск по названию и описанию.'
+    search_fields = ('name', 'description')
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        match = build_match_query(text)
+        if not match:
+            return queryset
+        if connection.vendor != 'sqlite':
+            condition = Q()
+            for field in self.search_fields:
+                condition |= Q(**{f'{field}__icontains': text})
+            return queryset.filter(condition)
+        if self.keeps_ordering(request, view):
+            return queryset.filter(pk__in=MatchingRowids(match))
+        # Соединение с индексом вместо коррелированного подзапроса bm25:
+        # подзапрос заново выполнял MATCH для каждой найденной записи,
+        # и частые слова искались за квадратичное время.
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=[TITLE_FTS_TABLE],
+            where=[
+                f'{TITLE_FTS_TABLE}.rowid = {table}.id',
+                f'{TITLE_FTS_TABLE} MATCH %s',
+            ],
+            params=[match],
+            select={'search_rank': f'bm25({TITLE_FTS_TABLE})'},
+        ).order_by('search_rank', 'id')
+
+    @staticmethod
+    def keeps_ordering(request, view):
+        # Ранжировать нужно только страницы списка; в facets и подобных
+        # действиях queryset используется как подзапрос.
+        if getattr(view, 'action', 'list') != 'list':
+            return True
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return True
+        paginator_class = getattr(view, 'cursor_pagination_class', None)
+        return (
+            paginator_class is not None
+            and paginator_class.cursor_query_param in request.query_params
+        )
@@ -0,0 +1,172 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.benchmark import (
+    api_route_names, benchmark_environment, budget_failures,
+    build_scenarios, create_missing_accounts, make_clients, measure,
+    sample_objects, scenario_route
+)
+from reviews.models import Comment, Review, Title, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет задержку (p50/p95/p99), число SQL-запросов и выделенную '
+        'память для всех маршрутов API и проверяет бюджеты'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=50,
+            help='Количество измеряемых запросов на сценарий',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=5,
+            help='Количество запросов на прогрев перед измерением',
+        )
+        parser.add_argument(
+            '--only', action='append', default=[],
+            help='Измерять только сценарии, имя которых содержит строку',
+        )
+        parser.add_argument(
+            '--output', help='Записать результаты в JSON-файл',
+        )
+        parser.add_argument(
+            '--latency-factor', type=float, default=1,
+            help='Множитель бюджетов задержки для медленных машин',
+        )
+        parser.add_argument(
+            '--no-latency-budget', action='store_true',
+            help='Проверять только бюджеты запросов и статусы ответов',
+        )
+        parser.add_argument(
+            '--with-cache', action='store_true',
+            help='Не отключать кеш ответов API',
+        )
+        parser.add_argument(
+            '--full-middleware', action='store_true',
+            help=(
+                'Пропускать запросы к API через BROWSER_MIDDLEWARE, '
+                'чтобы сравнить с сокращённой цепочкой'
+            ),
+        )
+        parser.add_argument(
+            '--json-backend', choices=('orjson', 'json'),
+            help='Библиотека JSON для ответов и запросов вместо '
+                 'API_JSON_BACKEND',
+        )
+        parser.add_argument(
+            '--generate', action='store_true',
+            help='Перед измерением заполнить базу командой generate_data',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть больше нуля.')
+        if options['generate']:
+            call_command('generate_data', verbosity=options['verbosity'])
+        # Недостающие учётные записи создаются только на время измерений.
+        with transaction.atomic():
+            create_missing_accounts()
+            objects = sample_objects()
+            scenarios = build_scenarios(objects)
+            if options['only']:
+                scenarios = [
+                    scenario for scenario in scenarios
+                    if any(part in scenario.name for part in options['only'])
+                ]
+            else:
+                self.check_coverage(scenarios)
+            if not scenarios:
+                raise CommandError('Нет сценариев для измерения.')
+            results = self.run(scenarios, objects, options)
+            report = self.report(results, options)
+            transaction.set_rollback(True)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        failed = [result for result in results if result['failures']]
+        if failed:
+            raise CommandError(
+                'Превышены бюджеты: ' + '; '.join(
+                    f'{result["name"]} ({", ".join(result["failures"])})'
+                    for result in failed
+                )
+            )
+
+    def run(self, scenarios, objects, options):
+        verbosity = int(options['verbosity'])
+        if verbosity > 0:
+            self.stdout.write(
+                f'{"сценарий":<28} {"p50":>8} {"p95":>8} {"p99":>8} '
+                f'{"запросы":>7} {"память":>9}'
+            )
+        results = []
+        with benchmark_environment(
+            options['with_cache'], options['full_middleware'],
+            options['json_backend'],
+        ):
+            clients = make_clients(objects)
+            for scenario in scenarios:
+                result = measure(
+                    scenario, clients, options['iterations'],
+                    options['warmup'],
+                )
+                budget = dict(scenario.budget)
+                if options['no_latency_budget']:
+                    budget['p95_ms'] = None
+                result['failures'] = budget_failures(
+                    result, budget, options['latency_factor']
+                )
+                results.append(result)
+                if verbosity > 0:
+                    self.write_result(result)
+        return results
+
+    def write_result(self, result):
+        line = (
+            f'{result["name"]:<28} {result["p50_ms"]:>8.2f} '
+            f'{result["p95_ms"]:>8.2f} {result["p99_ms"]:>8.2f} '
+            f'{result["queries"]:>7} {result["peak_bytes"] // 1024:>7} КБ'
+        )
+        if result['failures']:
+            self.stdout.write(self.style.ERROR(
+                f'{line}  {", ".join(result["failures"])}'
+            ))
+        else:
+            self.stdout.write(line)
+
+    def check_coverage(self, scenarios):
+        missing = api_route_names() - {
+            scenario_route(scenario) for scenario in scenarios
+        }
+        if missing:
+            raise CommandError(
+                'Маршруты без сценариев (нет данных в базе? заполните её '
+                'командой generate_data или запустите с --generate): '
+                + ', '.join(sorted(missing))
+            )
+
+    def report(self, results, options):
+        return {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'options': {
+                name: options[name] for name in (
+                    'iterations', 'warmup', 'with_cache', 'full_middleware',
+                    'json_backend', 'latency_factor',
+                )
+            },
+            'dataset': {
+                model.__name__.lower(): model.objects.count()
+                for model in (User, Title, Review, Comment)
+            },
+            'results': results,
+        }
@@ -0,0 +1,43 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api_yamdb.schema import SchemaDocument, build_schema
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит схему OpenAPI и записывает её в OPENAPI_SCHEMA_PATH, '
+        'откуда её отдаёт /openapi.json'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', help='Путь к файлу вместо OPENAPI_SCHEMA_PATH',
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Не записывать файл, а проверить, что он актуален',
+        )
+
+    def handle(self, *args, **options):
+        path = options['output'] or settings.OPENAPI_SCHEMA_PATH
+        document = SchemaDocument(build_schema())
+        if options['check']:
+            current = None
+            if os.path.exists(path):
+                with open(path, 'rb') as schema_file:
+                    current = schema_file.read()
+            if current != document.content:
+                raise CommandError(
+                    f'Схема в {path} устарела, выполните build_schema.'
+                )
+        else:
+            with open(path, 'wb') as schema_file:
+                schema_file.write(document.content)
+        if int(options['verbosity']) > 0:
+            self.stdout.write(self.style.SUCCESS(
+                f'{path}: {len(document.content)} байт, '
+                f'{len(document.gzipped)} байт в gzip, ETag {document.etag}'
+            ))
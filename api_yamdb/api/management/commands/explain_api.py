@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import access_token_for_user
+from reviews.models import ROLE_ADMIN, Category, Genre, Review, Title, User
+
+PLAN_WARNINGS = ('USE TEMP B-TREE',)
+
+
+def sample_urls():
+    """Адреса, повторяющие запросы клиентов, на данных из базы."""
+    title = Title.objects.order_by('-reviews_count').first()
+    review = Review.objects.order_by('-changed_at').first()
+    genre = Genre.objects.first()
+    category = Category.objects.first()
+    urls = [
+        '/api/v1/titles/',
+        '/api/v1/titles/?ordering=name',
+        '/api/v1/titles/?ordering=-year',
+        '/api/v1/titles/?cursor=',
+        '/api/v1/titles/?search=а',
+        '/api/v1/titles/facets/',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        '/api/v1/users/',
+    ]
+    if genre:
+        urls.append(f'/api/v1/titles/?genre={genre.slug}')
+    if category:
+        urls.append(f'/api/v1/titles/?category={category.slug}')
+    if title:
+        urls += [
+            f'/api/v1/titles/?year={title.year}',
+            f'/api/v1/titles/{title.pk}/',
+            f'/api/v1/titles/{title.pk}/reviews/',
+        ]
+    if review:
+        urls.append(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+        )
+    return urls
+
+
+def plan_problems(plan):
+    problems = []
+    for row in plan:
+        detail = row[-1]
+        if detail.startswith('SCAN') and ' USING ' not in detail:
+            problems.append(detail)
+        elif any(warning in detail for warning in PLAN_WARNINGS):
+            problems.append(detail)
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет запросы к API и проверяет планы SQL-запросов '
+        '(EXPLAIN QUERY PLAN) на полные просмотры таблиц и сортировки '
+        'во временных B-деревьях'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='*',
+            help='Адреса API; по умолчанию все списки на данных из базы',
+        )
+        parser.add_argument(
+            '--fail', action='store_true',
+            help='Завершиться с ошибкой, если найдены проблемные планы',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite.')
+        verbosity = int(options['verbosity'])
+        client = Client()
+        admin = User.objects.filter(role=ROLE_ADMIN).first()
+        if admin:
+            client.defaults['HTTP_AUTHORIZATION'] = (
+                f'Bearer {access_token_for_user(admin)}'
+            )
+        problems_found = 0
+        dummy_caches = {
+            alias: {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+            }
+            for alias in settings.CACHES
+        }
+        with override_settings(CACHES=dummy_caches):
+            for url in options['urls'] or sample_urls():
+                with CaptureQueriesContext(connection) as context:
+                    response = client.get(url)
+                queries = [
+                    query['sql'] for query in context.captured_queries
+                    if query['sql'].startswith('SELECT')
+                ]
+                self.stdout.write(
+                    f'{url} [{response.status_code}] '
+                    f'запросов: {len(queries)}'
+                )
+                for sql in queries:
+                    problems_found += self.explain(sql, verbosity)
+        if problems_found and options['fail']:
+            raise CommandError(f'Проблемных запросов: {problems_found}')
+
+    def explain(self, sql, verbosity):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = cursor.fetchall()
+        problems = plan_problems(plan)
+        if not problems and verbosity < 2:
+            return 0
+        style = self.style.WARNING if problems else self.style.SUCCESS
+        self.stdout.write(style(f'  {sql[:200]}'))
+        for row in plan:
+            self.stdout.write(f'    {row[-1]}')
+        return 1 if problems else 0
@@ -0,0 +1,192 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в отдельном интерпретаторе с -X importtime. Метки этапов
+# пишутся в stderr вперемешку со строками importtime, поэтому импорты
+# относятся к этапу, в котором они произошли. importtime не видит
+# importlib.import_module(), которым Django загружает приложения и
+# URLconf, поэтому с меткой выводятся и все новые модули этапа.
+PROBE = '''
+import json
+import sys
+from time import perf_counter
+
+loaded = set(sys.modules)
+
+def phase(name, started):
+    elapsed = perf_counter() - started
+    modules = sorted(set(sys.modules) - loaded)
+    loaded.update(modules)
+    print(f'modules: {json.dumps(modules)}', file=sys.stderr)
+    print(f'phase: {name} {elapsed}', file=sys.stderr, flush=True)
+    return perf_counter()
+
+started = perf_counter()
+import django
+django.setup()
+started = phase('setup', started)
+from django.urls import resolve
+resolve('/api/v1/')
+started = phase('urlconf', started)
+from django.test import Client
+Client().get('/api/v1/')
+started = phase('first_request', started)
+for path in sys.argv[1:]:
+    resolve(path)
+    started = phase(path, started)
+'''
+PHASE_LINE = re.compile(r'^phase: (\S+) (\S+)$')
+MODULES_LINE = re.compile(r'^modules: (.*)$')
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+# Этапы до первого ответа API: их сумма проверяется --budget-ms.
+STARTUP_PHASES = ('setup', 'urlconf', 'first_request')
+LAZY_PATHS = ('/swagger/', '/admin/')
+
+
+def parse_importtime(output):
+    """Этапы запуска с временем и импортами каждого этапа."""
+    phases = []
+    imports = []
+    modules = []
+    for line in output.splitlines():
+        match = PHASE_LINE.match(line)
+        if match:
+            phases.append({
+                'name': match[1],
+                'ms': round(float(match[2]) * 1000, 1),
+                'imports': imports,
+                'modules': modules,
+            })
+            imports = []
+            continue
+        match = MODULES_LINE.match(line)
+        if match:
+            modules = json.loads(match[1])
+            continue
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports.append({
+                'module': match[4],
+                'self_us': int(match[1]),
+                'cumulative_us': int(match[2]),
+                'top_level': len(match[3]) == 1,
+            })
+    for phase in phases:
+        phase['import_ms'] = round(
+            sum(item['self_us'] for item in phase['imports']) / 1000, 1
+        )
+    return phases
+
+
+def packages(imports):
+    """Собственное время импорта по пакетам верхнего уровня, в мс."""
+    totals = defaultdict(int)
+    for item in imports:
+        totals[item['module'].split('.')[0]] += item['self_us']
+    return {
+        package: round(total / 1000, 1)
+        for package, total in sorted(
+            totals.items(), key=lambda item: item[1], reverse=True
+        )
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время запуска воркера по этапам (django.setup, загрузка '
+        'URLconf, первый запрос) и время импорта модулей, как '
+        'python -X importtime'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=15,
+            help='Количество пакетов и модулей в отчёте для каждого этапа',
+        )
+        parser.add_argument(
+            '--output', help='Записать отчёт в JSON-файл',
+        )
+        parser.add_argument(
+            '--budget-ms', type=float,
+            help=(
+                'Завершиться с ошибкой, если путь до первого ответа API '
+                'занимает больше указанного времени'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        env = {
+            **os.environ,
+            # Внутри override_settings SETTINGS_MODULE равен None.
+            'DJANGO_SETTINGS_MODULE': os.environ.get(
+                'DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE
+            ),
+            'PYTHONPATH': os.pathsep.join(
+                filter(None, (settings.BASE_DIR, os.environ.get('PYTHONPATH')))
+            ),
+        }
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE, *LAZY_PATHS],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(
+                f'Не удалось запустить проект:\n{process.stderr[-2000:]}'
+            )
+        phases = parse_importtime(process.stderr)
+        startup_ms = round(sum(
+            phase['ms'] for phase in phases if phase['name'] in STARTUP_PHASES
+        ), 1)
+        if int(options['verbosity']) > 0:
+            self.write_report(phases, startup_ms, options['top'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(
+                    {'startup_ms': startup_ms, 'phases': [
+                        {
+                            'name': phase['name'], 'ms': phase['ms'],
+                            'import_ms': phase['import_ms'],
+                            'packages': packages(phase['imports']),
+                            'modules': phase['modules'],
+                            'imports': phase['imports'],
+                        }
+                        for phase in phases
+                    ]},
+                    file, ensure_ascii=False, indent=2,
+                )
+        if options['budget_ms'] and startup_ms > options['budget_ms']:
+            raise CommandError(
+                f'Запуск до первого ответа API занял {startup_ms} мс, '
+                f'бюджет {options["budget_ms"]} мс.'
+            )
+
+    def write_report(self, phases, startup_ms, top):
+        for phase in phases:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{phase["name"]}: {phase["ms"]} мс, '
+                f'из них импорт {phase["import_ms"]} мс, '
+                f'новых модулей {len(phase["modules"])}'
+            ))
+            for package, ms in list(packages(phase['imports']).items())[:top]:
+                self.stdout.write(f'  {ms:>8.1f} мс  {package}')
+            slowest = sorted(
+                (item for item in phase['imports'] if item['top_level']),
+                key=lambda item: item['cumulative_us'], reverse=True,
+            )[:top]
+            if slowest:
+                self.stdout.write('  модули с наибольшим временем импорта:')
+            for item in slowest:
+                self.stdout.write(
+                    f'  {item["cumulative_us"] / 1000:>8.1f} мс  '
+                    f'{item["module"]}'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'До первого ответа API: {startup_ms} мс'
+        ))
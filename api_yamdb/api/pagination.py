@@ -0,0 +1,256 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KnownCountLimitOffsetPagination(LimitOffsetPagination):
+    """LimitOffsetPagination без отдельного запроса COUNT.
+
+    Общее количество берётся из view.get_known_count(), если view его
+    уже знает.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        get_known_count = getattr(self.view, 'get_known_count', None)
+        count = get_known_count() if get_known_count else None
+        if count is None:
+            return super().get_count(queryset)
+        return count
+
+
+class KeysetPagination(BasePagination):
+    """Постраничный вывод по курсору без OFFSET.
+
+    Курсор хранит значения полей сортировки последней строки страницы,
+    следующая страница выбирается условием «строго после» этих значений,
+    поэтому стоимость запроса не зависит от глубины. К сортировке
+    добавляется `id`, чтобы порядок был однозначным. NULL считается
+    меньше любого значения, как в SQLite.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    max_limit = None
+    tiebreaker_field = 'id'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_limit(request)
+        ordering = self.get_ordering(queryset)
+        self.ordering_key = ','.join(
+            ('-' if descending else '') + field
+            for field, descending in ordering
+        )
+        position, self.reverse = self.decode_cursor(request)
+        if self.reverse:
+            ordering = [
+                (field, not descending) for field, descending in ordering
+            ]
+        rows = self.fetch(queryset, ordering, position, self.limit + 1)
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if self.reverse:
+            rows.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.fields = [field for field, _ in ordering]
+        self.page = rows
+        return rows
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        if limit <= 0:
+            return api_settings.PAGE_SIZE
+        if self.max_limit:
+            return min(limit, self.max_limit)
+        return limit
+
+    def get_ordering(self, queryset):
+        ordering = []
+        for field in (
+            queryset.query.order_by or queryset.model._meta.ordering
+        ):
+            descending = field.startswith('-')
+            ordering.append((field.lstrip('-'), descending))
+        if self.tiebreaker_field not in [field for field, _ in ordering]:
+            descending = ordering[-1][1] if ordering else False
+            ordering.append((self.tiebreaker_field, descending))
+        return ordering
+
+    def fetch(self, queryset, ordering, position, count):
+        queryset = queryset.order_by(*(
+            ('-' if descending else '') + field
+            for field, descending in ordering
+        ))
+        field, descending = ordering[0]
+        if not self.is_nullable(queryset.model, field):
+            if position is not None:
+                queryset = queryset.filter(
+                    self.seek_bound(field, descending, position[0]),
+                    self.after(ordering, position),
+                )
+            return list(queryset[:count])
+        # NULL-значения первого поля выбираются отдельным запросом, чтобы
+        # условие по непустым значениям оставалось диапазоном по индексу.
+        segments = [True, False] if not descending else [False, True]
+        if position is not None:
+            segments = segments[segments.index(position[0] is None):]
+        rows = []
+        for is_null in segments:
+            segment = queryset.filter(**{f'{field}__isnull': is_null})
+            if position is not None:
+                if not is_null:
+                    segment = segment.filter(
+                        self.seek_bound(field, descending, position[0])
+                    )
+                elif not self.is_nullable(queryset.model, ordering[1][0]):
+                    segment = segment.filter(
+                        self.seek_bound(*ordering[1], position[1])
+                    )
+                segment = segment.filter(self.after(ordering, position))
+                position = None
+            rows.extend(segment[:count - len(rows)])
+            if len(rows) >= count:
+                break
+        return rows
+
+    @staticmethod
+    def is_nullable(model, field):
+        try:
+            return model._meta.get_field(field).null
+        except FieldDoesNotExist:
+            return True
+
+    @staticmethod
+    def seek_bound(field, descending, value):
+        if value is None:
+            return Q()
+        lookup = 'lte' if descending else 'gte'
+        return Q(**{f'{field}__{lookup}': value})
+
+    @staticmethod
+    def strictly_after(field, descending, value):
+        if value is None:
+            if descending:
+                return Q(pk__in=[])
+            return Q(**{f'{field}__isnull': False})
+        if descending:
+            return (
+                Q(**{f'{field}__lt': value})
+                | Q(**{f'{field}__isnull': True})
+            )
+        return Q(**{f'{field}__gt': value})
+
+    def after(self, ordering, position):
+        (field, descending), *rest = ordering
+        value, *rest_position = position
+        condition = self.strictly_after(field, descending, value)
+        if rest:
+            if value is None:
+                equal = Q(**{f'{field}__isnull': True})
+            else:
+                equal = Q(**{field: value})
+            condition |= equal & self.after(rest, rest_position)
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position = cursor['p']
+            reverse = bool(cursor['r'])
+            ordering_key = cursor['o']
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            ordering_key != self.ordering_key
+            or not isinstance(position, list)
+            or len(position) != self.ordering_key.count(',') + 1
+            or not all(
+                value is None or isinstance(value, (int, float, str))
+                for value in position
+            )
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, obj, reverse):
+        cursor = {
+            'p': [getattr(obj, field) for field in self.fields],
+            'r': int(reverse),
+            'o': self.ordering_key,
+        }
+        encoded = urlsafe_b64encode(
+            json.dumps(cursor, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return replace_query_param(
+                self.base_url, self.cursor_query_param, ''
+            )
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.limit_query_param,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'integer'},
+            },
+        ]
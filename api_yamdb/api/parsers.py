@@ -0,0 +1,33 @@
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from api.renderers import FastJSONRenderer, orjson, use_orjson
+
+UTF8_NAMES = ('utf-8', 'utf8')
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson, если он установлен.
+
+    Ошибочный JSON повторно разбирает JSONParser: сообщение об ошибке
+    остаётся прежним.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if (
+            not use_orjson() or not self.strict
+            or encoding.lower() not in UTF8_NAMES
+        ):
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().parse(
+                io.BytesIO(content), media_type, parser_context
+            )
@@ -21,7 +21,7 @@ class IsAdminModeratorOwnerOrReadOnly(permissions.BasePermission):
         return request.user.is_authenticated
 
     def has_object_permission(self, request, view, obj):
-        if obj.author == request.user:
+        if obj.author_id == request.user.pk:
             return True
         if request.user.is_authenticated:
             return request.user.is_admin or request.user.is_moderator
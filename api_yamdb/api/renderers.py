@@ -0,0 +1,56 @@
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Даты и время передаются в encoder_class, чтобы формат совпадал с
+# JSONRenderer ('Z' вместо '+00:00').
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if orjson else 0
+)
+
+
+def use_orjson():
+    return orjson is not None and settings.API_JSON_BACKEND == 'orjson'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson.
+
+    datetime, Decimal, ленивые строки и другие типы, которых нет в JSON,
+    преобразует encoder_class JSONRenderer, поэтому ответ совпадает с
+    ответом JSONRenderer. С отступами (браузерная версия API), без orjson
+    или при API_JSON_BACKEND = 'json' работает JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            not use_orjson() or self.ensure_ascii or not self.compact
+            or self.get_indent(
+                accepted_media_type, renderer_context or {}
+            ) is not None
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            content = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            # Например, целые числа больше 64 бит.
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Как и JSONRenderer, экранируем разделители строк, недопустимые
+        # в строках JavaScript.
+        return content.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(b'\xe2\x80\xa9', b'\\u2029')
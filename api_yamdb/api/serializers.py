@@ -1,13 +1,46 @@
 from django.conf import settings
-from django.core.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from rest_framework.fields import empty
 
+from api_yamdb.timing import current_timer
 from reviews.models import Category, Comment, Genre, Review, Title, User
 from reviews.validators import username_validator
 
 
-class UserSerializer(serializers.ModelSerializer):
+class EagerLoadingMixin:
+    """Связи, которые нужно подгрузить заранее для сериализации списка."""
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(
+                *cls.prefetch_related_fields
+            )
+        return queryset
+
+
+class TimedSerializerMixin:
+    """Учитывает проверку и представление данных во времени
+    сериализации запроса (Server-Timing: serialize)."""
+
+    def run_validation(self, data=empty):
+        timer = current_timer.get()
+        if timer is None:
+            return super().run_validation(data)
+        return timer.serializing(super().run_validation, data)
+
+    def to_representation(self, instance):
+        timer = current_timer.get()
+        if timer is None:
+            return super().to_representation(instance)
+        return timer.serializing(super().to_representation, instance)
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = User
@@ -19,21 +52,25 @@ class UserSerializer(serializers.ModelSerializer):
         return username_validator(value)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Category
         exclude = ('id',)
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Genre
         exclude = ('id',)
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(
+    TimedSerializerMixin, EagerLoadingMixin, serializers.ModelSerializer
+):
+    select_related_fields = ('category',)
+    prefetch_related_fields = ('genre',)
     category = serializers.SlugRelatedField(
         slug_field='slug', queryset=Category.objects.all()
     )
@@ -53,10 +90,14 @@ class TitleSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleDetailSerializer(serializers.ModelSerializer):
+class TitleDetailSerializer(
+    TimedSerializerMixin, EagerLoadingMixin, serializers.ModelSerializer
+):
+    select_related_fields = ('category',)
+    prefetch_related_fields = ('genre',)
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -72,7 +113,10 @@ class TitleDetailSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(
+    TimedSerializerMixin, EagerLoadingMixin, serializers.ModelSerializer
+):
+    select_related_fields = ('author',)
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -81,20 +125,11 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date',)
 
-    def validate(self, data):
-        if (
-            self.context['request'].method != 'POST'
-            or not get_object_or_404(
-                Title, pk=self.context['view'].kwargs.get('title_id')
-            ).reviews.filter(author=self.context['request'].user).exists()
-        ):
-            return data
-        raise ValidationError(
-            'Нельзя добавить второй отзыв на то же самое произведение.'
-        )
-
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(
+    TimedSerializerMixin, EagerLoadingMixin, serializers.ModelSerializer
+):
+    select_related_fields = ('author',)
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username'
@@ -105,7 +140,7 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date',)
 
 
-class RegistrationSerializer(serializers.Serializer):
+class RegistrationSerializer(TimedSerializerMixin, serializers.Serializer):
     username = serializers.CharField(
         max_length=settings.USERNAME_MAX_LENGTH,
         validators=[username_validator]
@@ -115,7 +150,7 @@ class RegistrationSerializer(serializers.Serializer):
     )
 
 
-class GetTokenSerializer(serializers.Serializer):
+class GetTokenSerializer(TimedSerializerMixin, serializers.Serializer):
     username = serializers.CharField(
         max_length=settings.USERNAME_MAX_LENGTH,
         validators=[username_validator]
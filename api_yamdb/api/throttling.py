@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import threading
+from time import time
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+# Раз в столько списаний из хранилища удаляются давно полные корзины.
+PRUNE_EVERY = 1000
+PRUNE_AGE = 60 * 60 * 24
+
+
+class SQLiteBucketStore:
+    """Счётчики token bucket в файле SQLite, общем для всех воркеров.
+
+    Списание выполняется в транзакции BEGIN IMMEDIATE, поэтому лимит
+    соблюдается при одновременных запросах из разных процессов.
+    Соединение своё у каждого потока и процесса.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.operations = 0
+
+    def connection(self):
+        if getattr(self.local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            # Потеря счётчиков при сбое допустима, а fsync на каждый
+            # запрос — нет.
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS throttle_bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                'updated REAL NOT NULL) WITHOUT ROWID'
+            )
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+        return self.local.connection
+
+    def consume(self, key, capacity, refill_rate, now):
+        """Списывает токен из корзины key.
+
+        Возвращает пару (разрешено, токенов осталось).
+        """
+        connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT tokens, updated FROM throttle_bucket WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                tokens = capacity
+            else:
+                tokens = min(
+                    capacity, row[0] + max(0, now - row[1]) * refill_rate
+                )
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            connection.execute(
+                'INSERT OR REPLACE INTO throttle_bucket '
+                '(key, tokens, updated) VALUES (?, ?, ?)',
+                (key, tokens, now)
+            )
+            self.operations += 1
+            if self.operations % PRUNE_EVERY == 0:
+                connection.execute(
+                    'DELETE FROM throttle_bucket WHERE updated < ?',
+                    (now - PRUNE_AGE,)
+                )
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return allowed, tokens
+
+    def clear(self):
+        self.connection().execute('DELETE FROM throttle_bucket')
+
+
+_stores = {}
+
+
+def get_bucket_store():
+    path = settings.THROTTLE_STORE_PATH
+    if path not in _stores:
+        _stores[path] = SQLiteBucketStore(path)
+    return _stores[path]
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Ограничение частоты запросов по алгоритму token bucket.
+
+    Ставка вида '5/min' задаёт ёмкость корзины, которая равномерно
+    пополняется за указанный период. Счётчики хранятся в
+    get_bucket_store(), а не в кеше процесса. Ограничиваются только
+    методы из methods.
+    """
+    methods = ('POST',)
+
+    def allow_request(self, request, view):
+        if self.rate is None or request.method not in self.methods:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.allowed, self.tokens = get_bucket_store().consume(
+            self.key, self.num_requests, self.num_requests / self.duration,
+            time()
+        )
+        return self.allowed
+
+    def wait(self):
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """TokenBucketThrottle с областью из атрибута throttle_scope view."""
+
+    def __init__(self):
+        # Ставка определяется в allow_request, когда известна view.
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, 'throttle_scope', None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+
+class SignupThrottle(TokenBucketThrottle):
+    scope = 'signup'
+
+
+class TokenThrottle(TokenBucketThrottle):
+    scope = 'token'
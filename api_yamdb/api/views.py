@@ -1,17 +1,26 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (
+    action, api_view, permission_classes, throttle_classes
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.settings import api_settings
 
-from api.filters import TitleFilter
+from api.authentication import access_token_for_user
+from api.cache import (
+    CachedListMixin, ConditionalGetMixin, cached_response, get_versions
+)
+from api.filters import TitleFilter, TitleSearchFilter
+from api.pagination import (
+    KeysetPagination, KnownCountLimitOffsetPagination
+)
 from api.permissions import (
     IsAdmin, IsAdminModeratorOwnerOrReadOnly, IsAdminOrReadOnly
 )
@@ -20,8 +29,23 @@ from api.serializers import (
     RegistrationSerializer, ReviewSerializer, TitleDetailSerializer,
     TitleSerializer, UserSerializer
 )
+from api.throttling import SignupThrottle, TokenThrottle
 from api_yamdb.settings import EMAIL_ADRESS
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.outbox import enqueue_mail
+
+
+class EagerLoadingViewSetMixin:
+    """Применяет к queryset связи, объявленные в классе сериализатора."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        setup_eager_loading = getattr(
+            self.get_serializer_class(), 'setup_eager_loading', None
+        )
+        if setup_eager_loading is None:
+            return queryset
+        return setup_eager_loading(queryset)
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -38,22 +62,25 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def user_information(self, request):
+        # Пользователь из токена содержит только роль и флаги.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
             return Response(
-                UserSerializer(request.user).data,
+                UserSerializer(user).data,
                 status=status.HTTP_200_OK
             )
         serializer = UserSerializer(
-            request.user, data=request.data, partial=True
+            user, data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save(role=request.user.role)
+        serializer.save(role=user.role)
         return Response(
             serializer.data, status=status.HTTP_200_OK
         )
 
 
 class CategoryGenreBaseViewSet(
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -72,22 +99,93 @@ class CategoryGenreBaseViewSet(
 class CategoryViewSet(CategoryGenreBaseViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_dependencies = ('category',)
 
 
 class GenreViewSet(CategoryGenreBaseViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_dependencies = ('genre',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
-    filter_backends = [filters.OrderingFilter, DjangoFilterBackend]
+class TitleViewSet(
+    ConditionalGetMixin,
+    CachedListMixin,
+    EagerLoadingViewSetMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Title.objects.all()
+    filter_backends = [
+        filters.OrderingFilter, DjangoFilterBackend, TitleSearchFilter
+    ]
     ordering_fields = ['rating', 'name', 'description', 'year']
     ordering = ('-rating', 'name', )
     filterset_class = TitleFilter
     serializer_class = TitleSerializer
     detail_serializer_class = TitleDetailSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    cursor_pagination_class = KeysetPagination
+    cache_dependencies = ('title', 'review', 'category', 'genre')
+    facets_cache_dependencies = ('title', 'category', 'genre')
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, '_paginator')
+            and self.cursor_pagination_class.cursor_query_param
+            in self.request.query_params
+        ):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+    def get_change_marker(self):
+        if self.action == 'list':
+            return get_versions(self.cache_dependencies), None
+        changed_at = Title.objects.filter(
+            pk=self.kwargs.get('pk')
+        ).order_by().values_list('changed_at', flat=True).first()
+        if changed_at is None:
+            return None
+        return (
+            (changed_at, *get_versions(('category', 'genre'))), changed_at
+        )
+
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        return cached_response(
+            request, f'{self.basename}-facets',
+            self.facets_cache_dependencies,
+            lambda: Response(self.get_facets()),
+        )
+
+    def get_facets(self):
+        titles = self.filter_queryset(
+            self.get_queryset()
+        ).order_by().prefetch_related(None)
+        categories = titles.filter(category__isnull=False).values_list(
+            'category__slug', 'category__name'
+        ).annotate(count=Count('pk')).order_by('category__slug')
+        genres = Title.genre.through.objects.filter(
+            title_id__in=titles.values('pk')
+        ).values_list(
+            'genre__slug', 'genre__name'
+        ).annotate(count=Count('pk')).order_by('genre__slug')
+        years = titles.values_list('year').annotate(
+            count=Count('pk')
+        ).order_by('year')
+        return {
+            'category': [
+                {'slug': slug, 'name': name, 'count': count}
+                for slug, name, count in categories
+            ],
+            'genre': [
+                {'slug': slug, 'name': name, 'count': count}
+                for slug, name, count in genres
+            ],
+            'year': [
+                {'year': year, 'count': count} for year, count in years
+            ],
+        }
 
     def get_serializer_class(self):
         if self.action in ['retrieve', 'list']:
@@ -95,58 +193,118 @@ class TitleViewSet(viewsets.ModelViewSet):
         return self.serializer_class
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ConditionalGetMixin, EagerLoadingViewSetMixin, viewsets.ModelViewSet
+):
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModeratorOwnerOrReadOnly,)
+    throttle_scope = 'reviews'
 
     def get_title(self) -> Title:
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id')
+            )
+        return self._title
+
+    def get_change_marker(self):
+        changed_at = self.get_title().changed_at
+        return changed_at, changed_at
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        title = self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            # Повторный отзыв отсекает ограничение unique_review, без
+            # предварительной проверки и гонки между проверкой и вставкой.
+            if not title.reviews.filter(author=self.request.user).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Нельзя добавить второй отзыв на то же самое '
+                    'произведение.'
+                ]
+            })
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        if getattr(self, 'swagger_fake_view', False):
+            # Генератор схемы API вызывает метод без title_id.
+            return Review.objects.none()
+        return super().get_queryset().filter(title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalGetMixin, EagerLoadingViewSetMixin, viewsets.ModelViewSet
+):
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = (IsAdminModeratorOwnerOrReadOnly,)
+    throttle_scope = 'comments'
+    pagination_class = KnownCountLimitOffsetPagination
 
     def get_review(self) -> Review:
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+        if not hasattr(self, '_review'):
+            reviews = Review.objects.filter(
+                title_id=self.kwargs.get('title_id')
+            )
+            if self.action == 'list':
+                # Количество комментариев для пагинации приходит тем же
+                # запросом, что и проверка пары (title_id, review_id).
+                reviews = reviews.annotate(comments_count=Count('comments'))
+            self._review = get_object_or_404(
+                reviews, id=self.kwargs.get('review_id')
+            )
+        return self._review
+
+    def get_known_count(self):
+        return getattr(self.get_review(), 'comments_count', None)
+
+    def get_change_marker(self):
+        changed_at = self.get_review().changed_at
+        return changed_at, changed_at
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        if getattr(self, 'swagger_fake_view', False):
+            return Comment.objects.none()
+        return super().get_queryset().filter(review=self.get_review())
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([SignupThrottle])
 def signup(request):
     serializer = RegistrationSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     try:
-        user, _ = User.objects.get_or_create(**serializer.validated_data)
+        with transaction.atomic():
+            user, _ = User.objects.get_or_create(
+                **serializer.validated_data
+            )
+            confirmation_code = default_token_generator.make_token(user)
+            # Письмо отправит команда send_outbox.
+            enqueue_mail(
+                'Токен',
+                f'Ваш токен: {confirmation_code}',
+                EMAIL_ADRESS,
+                [f'{serializer.validated_data["email"]}']
+            )
     except IntegrityError:
         return Response(
             {'username': 'Пользователь с таким именем или почтой уже есть.'},
             status=status.HTTP_400_BAD_REQUEST
         )
-    confirmation_code = default_token_generator.make_token(user)
-    send_mail(
-        'Токен',
-        f'Ваш токен: {confirmation_code}',
-        EMAIL_ADRESS,
-        [f'{serializer.validated_data["email"]}']
-    )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([TokenThrottle])
 def token(request):
     serializer = GetTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -156,7 +314,7 @@ def token(request):
     )
     if confirmation_code_is_valid:
         return Response(
-            {'token': str(RefreshToken.for_user(user).access_token)},
+            {'token': str(access_token_for_user(user))},
             status=status.HTTP_201_CREATED
         )
     return Response(
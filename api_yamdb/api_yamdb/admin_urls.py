@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+# Модули admin.py приложений загружаются вместе с этим URLconf, а не при
+# запуске воркера: в INSTALLED_APPS подключён SimpleAdminConfig.
+admin.autodiscover()
+
+app_name = 'admin'
+
+urlpatterns = admin.site.get_urls()
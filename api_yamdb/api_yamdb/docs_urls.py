@@ -0,0 +1,16 @@
+from django.urls import path
+from django.views.generic import TemplateView
+
+from api_yamdb.schema import schema_json, swagger_ui
+
+app_name = 'docs'
+
+urlpatterns = [
+    path(
+        'redoc/',
+        TemplateView.as_view(template_name='redoc.html'),
+        name='redoc'
+    ),
+    path('swagger/', swagger_ui, name='schema-swagger-ui'),
+    path('openapi.json', schema_json, name='openapi-schema'),
+]
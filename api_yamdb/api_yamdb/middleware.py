@@ -0,0 +1,156 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.db import connection
+from django.utils.encoding import escape_uri_path
+from django.utils.module_loading import import_string
+
+from api_yamdb.timing import RequestTimer, current_timer
+
+timing_logger = logging.getLogger('api_yamdb.timing')
+
+
+class BrowserMiddleware:
+    """Цепочка BROWSER_MIDDLEWARE, которую пропускают запросы к API.
+
+    Сессии, CSRF, пользователь Django и сообщения нужны только админке и
+    страницам документации: API аутентифицирует запросы по JWT. Запросы
+    с путём из LEAN_MIDDLEWARE_PATHS передаются дальше сразу, остальные
+    проходят вложенную цепочку так же, как если бы она была в MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        handler = convert_exception_to_response(get_response)
+        self.view_middleware = []
+        self.template_response_middleware = []
+        self.exception_middleware = []
+        # Та же сборка цепочки, что в BaseHandler.load_middleware().
+        for middleware_path in reversed(settings.BROWSER_MIDDLEWARE):
+            try:
+                middleware = import_string(middleware_path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(middleware, 'process_view'):
+                self.view_middleware.insert(0, middleware.process_view)
+            if hasattr(middleware, 'process_template_response'):
+                self.template_response_middleware.append(
+                    middleware.process_template_response
+                )
+            if hasattr(middleware, 'process_exception'):
+                self.exception_middleware.append(
+                    middleware.process_exception
+                )
+            handler = convert_exception_to_response(middleware)
+        self.browser_chain = handler
+
+    @staticmethod
+    def is_lean(request):
+        return request.path_info.startswith(
+            tuple(settings.LEAN_MIDDLEWARE_PATHS)
+        )
+
+    def __call__(self, request):
+        if self.is_lean(request):
+            return self.get_response(request)
+        return self.browser_chain(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_lean(request):
+            return None
+        for process_view in self.view_middleware:
+            response = process_view(
+                request, view_func, view_args, view_kwargs
+            )
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if self.is_lean(request):
+            return response
+        for process_template_response in self.template_response_middleware:
+            response = process_template_response(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        if self.is_lean(request):
+            return None
+        for process_exception in self.exception_middleware:
+            response = process_exception(request, exception)
+            if response is not None:
+                return response
+        return None
+
+
+def view_name(request, view_func):
+    """Имя обработчика для журнала: ViewSet.action для viewset'ов DRF,
+    имя класса или функции для остальных."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', type(view_func).__name__)
+    actions = getattr(view_func, 'actions', None)
+    if not actions:
+        return view_class.__name__
+    method = request.method.lower()
+    return f'{view_class.__name__}.{actions.get(method, method)}'
+
+
+class RequestTimingMiddleware:
+    """Замеряет время запроса, время и число SQL-запросов, время
+    сериализации и отрисовки ответа.
+
+    Результат отдаётся в заголовке Server-Timing (если включён
+    SERVER_TIMING_HEADER) и пишется в журнал api_yamdb.timing строкой
+    key=value с именем обработчика. Должен стоять первым в MIDDLEWARE,
+    чтобы total включал остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = RequestTimer()
+        token = current_timer.set(timer)
+        try:
+            with connection.execute_wrapper(timer):
+                response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        timer.stop()
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = timer.server_timing()
+        if timing_logger.isEnabledFor(logging.INFO):
+            self.log(request, response, timer)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timer = current_timer.get()
+        if timer is not None:
+            timer.view = view_name(request, view_func)
+
+    def process_template_response(self, request, response):
+        # Вызывается последним перед response.render(); время отрисовки
+        # заканчивается в post-render callback ответа.
+        timer = current_timer.get()
+        if timer is not None:
+            timer.start_render()
+            response.add_post_render_callback(timer.finish_render)
+        return response
+
+    @staticmethod
+    def log(request, response, timer):
+        metrics = timer.metrics()
+        timing_logger.info(
+            'view=%s method=%s path=%s status=%s %s',
+            timer.view or '-', request.method,
+            escape_uri_path(request.path), response.status_code,
+            ' '.join(f'{name}={value}' for name, value in metrics.items()),
+            extra={
+                'view': timer.view, 'method': request.method,
+                'path': request.path, 'status': response.status_code,
+                **metrics,
+            },
+        )
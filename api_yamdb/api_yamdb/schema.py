@@ -0,0 +1,135 @@
+import gzip
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import SwaggerUIRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+def resolve_callables(data):
+    """Заменяет функции в схеме их значениями.
+
+    Такие значения появляются из валидаторов с вычисляемой границей,
+    например MaxValueValidator(get_current_year).
+    """
+    items = data.items() if isinstance(data, dict) else enumerate(data)
+    for key, value in items:
+        if callable(value):
+            data[key] = value()
+        elif isinstance(value, (dict, list)):
+            resolve_callables(value)
+
+
+class SchemaGenerator(OpenAPISchemaGenerator):
+
+    def get_schema(self, request=None, public=False):
+        schema = super().get_schema(request, public)
+        resolve_callables(schema)
+        return schema
+
+
+SCHEMA_VERSION = 'v1'
+SCHEMA_INFO = openapi.Info(
+    title="YaMDb API",
+    default_version=SCHEMA_VERSION,
+    description="Документация для API проекта YaMDb",
+    contact=openapi.Contact(email="gritsenko.serge.2013@yandex.ru"),
+)
+
+schema_view = get_schema_view(
+    SCHEMA_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+    generator_class=SchemaGenerator,
+)
+
+
+def build_schema():
+    """Схема API в JSON без привязки к хосту запроса."""
+    generator = schema_view.generator_class(SCHEMA_INFO)
+    return OpenAPICodecJson(validators=[]).encode(
+        generator.get_schema(request=None, public=True)
+    )
+
+
+class SchemaDocument:
+    """Готовая схема: тело, сжатое тело и ETag по содержимому."""
+
+    def __init__(self, content):
+        self.content = content
+        self.gzipped = gzip.compress(content, mtime=0)
+        self.etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+_document = None
+
+
+def get_schema_document():
+    """Схема из OPENAPI_SCHEMA_PATH или, если файла нет, построенная
+    один раз за время жизни процесса."""
+    global _document
+    if _document is None:
+        path = settings.OPENAPI_SCHEMA_PATH
+        if os.path.exists(path):
+            with open(path, 'rb') as schema_file:
+                content = schema_file.read()
+        else:
+            content = build_schema()
+        _document = SchemaDocument(content)
+    return _document
+
+
+def reset_schema_document():
+    global _document
+    _document = None
+
+
+@require_safe
+def schema_json(request):
+    """Отдаёт готовую схему без разбора viewset'ов на каждый запрос."""
+    document = get_schema_document()
+    if document.etag in parse_etags(
+        request.META.get('HTTP_IF_NONE_MATCH', '')
+    ):
+        response = HttpResponseNotModified()
+    elif ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        response = HttpResponse(
+            document.gzipped, content_type='application/json'
+        )
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(
+            document.content, content_type='application/json'
+        )
+    response['ETag'] = document.etag
+    patch_vary_headers(response, ('Accept-Encoding',))
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_safe
+def swagger_ui(request):
+    """Страница Swagger UI без построения схемы: схему браузер загружает
+    по SPEC_URL (/openapi.json)."""
+    renderer = SwaggerUIRenderer()
+    context = {'request': request}
+    renderer.set_context(context)
+    context.update(
+        title=SCHEMA_INFO.title, version=SCHEMA_VERSION
+    )
+    return HttpResponse(
+        render_to_string(renderer.template, context, request)
+    )
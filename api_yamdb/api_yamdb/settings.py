@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,7 +12,9 @@ ALLOWED_HOSTS = ['*']
 
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Без автоматического поиска admin.py при запуске: его выполняет
+    # api_yamdb/admin_urls.py при первом запросе к админке.
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -22,19 +25,57 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'reviews',
-    'api',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'api_yamdb.middleware.BrowserMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Middleware админки и страниц документации. Запросы с путём из
+# LEAN_MIDDLEWARE_PATHS их не проходят: API аутентифицирует по JWT.
+# Пустой LEAN_MIDDLEWARE_PATHS включает полную цепочку для всех запросов.
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+LEAN_MIDDLEWARE_PATHS = ('/api/',)
+
+# Проверки админки ищут эти middleware только в MIDDLEWARE, а они
+# подключены через BrowserMiddleware.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
+# Время этапов запроса в заголовке Server-Timing. Строки журнала
+# api_yamdb.timing пишутся независимо от этой настройки.
+SERVER_TIMING_HEADER = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api_yamdb.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Админка и документация API подключаются к URLconf лениво; воркерам,
+# которые обслуживают только API, их можно отключить совсем.
+ENABLE_ADMIN = True
+ENABLE_API_DOCS = True
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -63,6 +104,23 @@ DATABASES = {
     }
 }
 
+# Кеш ответов API. Для нескольких воркеров на одном сервере используйте
+# общий для процессов бэкенд, например файловый кеш в разделяемой памяти:
+# 'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+# 'LOCATION': '/dev/shm/api_yamdb_cache',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api',
+    },
+}
+
+API_CACHE_ALIAS = 'api'
+API_CACHE_TIMEOUT = 60 * 10
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -95,19 +153,47 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 AUTH_USER_MODEL = 'reviews.User'
 
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 100,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.ScopedTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '5/min',
+        'token': '10/min',
+        'reviews': '30/min',
+        'comments': '60/min',
+    },
 }
 
+# Библиотека для FastJSONRenderer и FastJSONParser: 'orjson' (если
+# установлен) или 'json' из стандартной библиотеки.
+API_JSON_BACKEND = 'orjson'
+
+# Файл SQLite со счётчиками ограничения частоты запросов, общий для всех
+# воркеров; для скорости его можно разместить в /dev/shm.
+THROTTLE_STORE_PATH = os.path.join(
+    tempfile.gettempdir(), 'api_yamdb_throttle.sqlite3'
+)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -120,9 +206,15 @@ SWAGGER_SETTINGS = {
             'name': 'Authorization',
             'in': 'header'
         }
-    }
+    },
+    # Swagger UI загружает готовую схему вместо ?format=openapi.
+    'SPEC_URL': 'docs:openapi-schema',
 }
 
+# Схема API, записанная командой build_schema. Если файла нет, схема
+# строится при первом запросе и хранится в памяти процесса.
+OPENAPI_SCHEMA_PATH = os.path.join(BASE_DIR, 'openapi.json')
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -0,0 +1,86 @@
+from contextvars import ContextVar
+from time import perf_counter
+
+# Замер текущего запроса; его заполняют RequestTimingMiddleware,
+# сериализаторы API и обработчик ответа.
+current_timer = ContextVar('request_timer', default=None)
+
+
+class RequestTimer:
+    """Время запроса по этапам, в секундах, и число SQL-запросов.
+
+    db — время выполнения запросов курсором (execute), без построения
+    запросов ORM и создания объектов моделей. Время сериализации и
+    отрисовки ответа не включает SQL-запросы, выполненные внутри этих
+    этапов: они учитываются в db.
+    """
+    __slots__ = (
+        'started', 'total', 'db', 'queries', 'serialize', 'render',
+        'view', 'nested', 'render_started', 'render_db',
+    )
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.total = self.db = self.serialize = self.render = 0.0
+        self.queries = 0
+        self.view = None
+        self.nested = False
+        self.render_started = self.render_db = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка connection.execute_wrapper()."""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += perf_counter() - started
+            self.queries += 1
+
+    def serializing(self, method, *args):
+        """Вызывает метод сериализатора и учитывает его время.
+
+        Вложенные сериализаторы вызываются внутри внешнего и отдельно
+        не замеряются.
+        """
+        if self.nested:
+            return method(*args)
+        self.nested = True
+        started, db = perf_counter(), self.db
+        try:
+            return method(*args)
+        finally:
+            self.nested = False
+            self.serialize += perf_counter() - started - (self.db - db)
+
+    def start_render(self):
+        self.render_started, self.render_db = perf_counter(), self.db
+
+    def finish_render(self, response=None):
+        if self.render_started is not None:
+            self.render += (
+                perf_counter() - self.render_started
+                - (self.db - self.render_db)
+            )
+            self.render_started = None
+
+    def stop(self):
+        self.total = perf_counter() - self.started
+
+    def metrics(self):
+        """Длительности этапов в миллисекундах."""
+        return {
+            'total_ms': round(self.total * 1000, 2),
+            'db_ms': round(self.db * 1000, 2),
+            'queries': self.queries,
+            'serialize_ms': round(self.serialize * 1000, 2),
+            'render_ms': round(self.render * 1000, 2),
+        }
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing."""
+        return (
+            f'total;dur={self.total * 1000:.2f}, '
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries", '
+            f'serialize;dur={self.serialize * 1000:.2f}, '
+            f'render;dur={self.render * 1000:.2f}'
+        )
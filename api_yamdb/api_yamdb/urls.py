@@ -1,32 +1,57 @@
-from django.contrib import admin
-from django.urls import include, path
-from django.views.generic import TemplateView
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="YaMDb API",
-        default_version='v1',
-        description="Документация для API проекта YaMDb",
-        contact=openapi.Contact(email="gritsenko.serge.2013@yandex.ru"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from django.conf import settings
+from django.urls import URLResolver, include, path
+from django.urls.resolvers import RoutePattern
+
+
+class LazyURLResolver(URLResolver):
+    """URLResolver, импортирующий модуль urlconf при первом обращении
+    к своим маршрутам.
+
+    Корневой резолвер при первом reverse() заполняет все вложенные;
+    этот резолвер откладывает заполнение до reverse() в его собственном
+    пространстве имён.
+    """
+
+    def _populate(self):
+        if 'urlconf_module' in self.__dict__:
+            super()._populate()
+
+    @property
+    def reverse_dict(self):
+        self.urlconf_module
+        return super().reverse_dict
+
+    @property
+    def namespace_dict(self):
+        self.urlconf_module
+        return super().namespace_dict
+
+    @property
+    def app_dict(self):
+        self.urlconf_module
+        return super().app_dict
+
+
+def lazy_include(route, urlconf, namespace):
+    """Как include(), но urlconf загружается при первом запросе к
+    маршруту. Пространство имён обязательно: маршруты без него корневой
+    резолвер собирает при первом же reverse()."""
+    return LazyURLResolver(
+        RoutePattern(route, is_endpoint=False), urlconf,
+        app_name=namespace, namespace=namespace,
+    )
+
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include('api.urls', namespace='api')),
-    path(
-        'redoc/',
-        TemplateView.as_view(template_name='redoc.html'),
-        name='redoc'
-    ),
-    path(
-        'swagger/',
-        schema_view.with_ui('swagger', cache_timeout=0),
-        name='schema-swagger-ui'
-    ),
 ]
+
+if settings.ENABLE_ADMIN:
+    urlpatterns.append(
+        lazy_include('admin/', 'api_yamdb.admin_urls', 'admin')
+    )
+
+if settings.ENABLE_API_DOCS:
+    # Пустой префикс: URLconf документации загружается только запросами,
+    # которые не подошли к маршрутам выше.
+    urlpatterns.append(lazy_include('', 'api_yamdb.docs_urls', 'docs'))
@@ -1,7 +1,9 @@
 from django.conf import settings
 from django.contrib import admin
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (
+    Category, Comment, Genre, OutgoingEmail, Review, Title, User
+)
 
 
 @admin.register(User)
@@ -53,6 +55,7 @@ class TitleAdmin(admin.ModelAdmin):
         'year',
         'description',
         'category',
+        'rating',
     )
     list_editable = ('category', )
     search_fields = ('name', 'description', )
@@ -89,3 +92,18 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ('text', )
     list_filter = ('author', 'review', )
     empty_value_display = settings.ADMIN_MODEL_EMPTY_VALUE
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'to',
+        'subject',
+        'created_at',
+        'attempts',
+        'next_attempt_at',
+    )
+    search_fields = ('to', )
+    readonly_fields = ('last_error', )
+    empty_value_display = settings.ADMIN_MODEL_EMPTY_VALUE
@@ -0,0 +1,90 @@
+"""Разбор CSV-файлов load_data в процессах пула.
+
+Процессы, запущенные через spawn или forkserver, импортируют этот модуль
+до django.setup(), поэтому модели здесь не импортируются на уровне
+модуля: воркер получает метку модели и находит её после init_worker().
+"""
+import csv
+import os
+import pickle
+from itertools import islice
+from time import perf_counter
+
+import django
+from django.apps import apps
+from django.core.exceptions import ValidationError
+
+
+def init_worker(settings_module=None):
+    if settings_module:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def read_rows(csv_file):
+    """Номера и строки CSV-файла в виде словарей поле -> значение."""
+    reader = csv.reader(csv_file, delimiter=',', quotechar='"')
+    header = next(reader, None)
+    if header is None:
+        return
+    for row in reader:
+        yield reader.line_num, dict(zip(header, row))
+
+
+def typed_rows(model, rows):
+    """Значения строк CSV, проверенные и приведённые к типам полей.
+
+    Связи только приводятся к типу ключа: их наличие проверит база.
+    """
+    fields = None
+    for line_num, row in rows:
+        if fields is None:
+            fields = {name: model._meta.get_field(name) for name in row}
+        try:
+            yield {
+                name: (
+                    field.to_python(row[name]) if field.is_relation
+                    else field.clean(row[name], None)
+                )
+                for name, field in fields.items()
+            }
+        except ValidationError as error:
+            raise ValueError(f'Строка {line_num}: {"; ".join(error)}')
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def parse_table(model_label, file_path, batch_size, spool_dir):
+    """Читает и проверяет CSV-файл таблицы модели model_label.
+
+    Пачки строк сохраняются в файл в spool_dir, чтобы не передавать всю
+    таблицу между процессами через память. Возвращает путь к файлу,
+    число строк и время разбора.
+    """
+    started = perf_counter()
+    model = apps.get_model(model_label)
+    spool_path = os.path.join(spool_dir, f'{model_label.lower()}.pickle')
+    rows = 0
+    with open(file_path, 'rt', encoding='utf-8') as csv_file, \
+            open(spool_path, 'wb') as spool:
+        for batch in batches(typed_rows(model, read_rows(csv_file)),
+                             batch_size):
+            pickle.dump(batch, spool, pickle.HIGHEST_PROTOCOL)
+            rows += len(batch)
+    return spool_path, rows, perf_counter() - started
+
+
+def spooled_batches(spool_path):
+    with open(spool_path, 'rb') as spool:
+        while True:
+            try:
+                yield pickle.load(spool)
+            except EOFError:
+                return
@@ -0,0 +1,331 @@
+import csv
+import os
+import random
+from array import array
+from datetime import datetime, timedelta, timezone
+from math import gcd
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import bump_versions
+from reviews.csv_parsing import batches
+from reviews.management.commands.load_data import (
+    BATCH_SIZE, CACHED_RESOURCES, TABLES, bulk_load_pragmas, clear_tables
+)
+from reviews.management.commands.load_data import Command as LoadData
+from reviews.models import (
+    ROLE_ADMIN, ROLE_MODERATOR, ROLE_USER, Category, Comment, Genre, Review,
+    Title, User
+)
+
+WORDS = (
+    'тень', 'город', 'ночь', 'дорога', 'море', 'звезда', 'огонь', 'время',
+    'память', 'война', 'любовь', 'тайна', 'остров', 'ветер', 'зеркало',
+    'король', 'мастер', 'сад', 'поезд', 'зима', 'лето', 'камень', 'песня',
+    'сердце', 'река', 'небо', 'дом', 'путь', 'сон', 'свет', 'голос', 'лес',
+    'корабль', 'письмо', 'ключ', 'маяк', 'пустыня', 'машина', 'граница',
+    'отличный', 'скучный', 'сильный', 'странный', 'последний', 'тихий',
+    'тёмный', 'белый', 'далёкий', 'новый', 'старый', 'быстрый', 'живой',
+    'сюжет', 'финал', 'герой', 'автор', 'актёр', 'музыка', 'эпизод', 'глава',
+)
+CATEGORY_NAMES = ('Фильм', 'Книга', 'Музыка', 'Сериал', 'Игра', 'Спектакль')
+GENRE_NAMES = (
+    'Драма', 'Комедия', 'Вестерн', 'Фэнтези', 'Фантастика', 'Детектив',
+    'Триллер', 'Сказка', 'Гонзо', 'Ужасы', 'Роман', 'Рок', 'Джаз', 'Шансон',
+    'Классика', 'Приключения', 'Мелодрама', 'Боевик', 'Мюзикл', 'Нуар',
+)
+FIRST_YEAR = 1900
+LAST_YEAR = 2022
+DATES_START = datetime(2015, 1, 1, tzinfo=timezone.utc)
+DATES_SPAN = int(timedelta(days=365 * 7).total_seconds())
+# Множитель для перестановки рангов популярности по id: популярные
+# записи не должны идти подряд в начале таблицы.
+SCATTER_FACTOR = 2654435761
+
+
+def zipf_rank(rng, n, s):
+    """Ранг от 1 до n с вероятностью примерно пропорциональной 1 / ранг^s.
+
+    Непрерывное приближение обратной функцией распределения: выборка
+    за O(1) без таблицы весов.
+    """
+    u = rng.random()
+    if s == 1:
+        x = (n + 1) ** u
+    else:
+        x = (((n + 1) ** (1 - s) - 1) * u + 1) ** (1 / (1 - s))
+    return min(int(x), n)
+
+
+def coprime(n, start):
+    factor = start % n or 1
+    while gcd(factor, n) != 1:
+        factor += 1
+    return factor
+
+
+class Scatter:
+    """Взаимно однозначное отображение рангов 1..n в id 1..n."""
+
+    def __init__(self, n):
+        self.n = n
+        self.factor = coprime(n, SCATTER_FACTOR)
+
+    def __call__(self, rank):
+        return (rank - 1) * self.factor % self.n + 1
+
+
+class Generator:
+    """Детерминированно порождает строки таблиц из TABLES.
+
+    Популярность пользователей, категорий, жанров, произведений и
+    отзывов распределена по закону Ципфа с показателем skew. Строки
+    отдаются генераторами по одной, поэтому память зависит только от
+    числа произведений.
+    """
+
+    def __init__(self, seed, users, categories, genres, titles, reviews,
+                 comments, max_genres, skew):
+        self.seed = seed
+        self.users = users
+        self.categories = categories
+        self.genres = genres
+        self.titles = titles
+        self.reviews = reviews
+        self.comments = comments
+        self.max_genres = min(max_genres, genres)
+        self.skew = skew
+        self.user_ids = Scatter(users)
+        self.title_ids = Scatter(titles)
+
+    def rng(self, table):
+        # У каждой таблицы свой поток случайных чисел: результат не
+        # зависит от порядка и количества вызовов других генераторов.
+        return random.Random(f'{self.seed}:{table}')
+
+    def words(self, rng, low, high):
+        return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+    def date(self, rng):
+        return DATES_START + timedelta(seconds=rng.randrange(DATES_SPAN))
+
+    def rows(self, model):
+        return {
+            User: self.user_rows,
+            Category: self.category_rows,
+            Genre: self.genre_rows,
+            Title: self.title_rows,
+            Title.genre.through: self.genre_title_rows,
+            Review: self.review_rows,
+            Comment: self.comment_rows,
+        }[model]()
+
+    def user_rows(self):
+        rng = self.rng('users')
+        for pk in range(1, self.users + 1):
+            role = rng.random()
+            yield {
+                'id': pk,
+                'username': f'user{pk}',
+                'email': f'user{pk}@yamdb.fake',
+                'role': (
+                    ROLE_ADMIN if role < 0.001
+                    else ROLE_MODERATOR if role < 0.01 else ROLE_USER
+                ),
+                'bio': '',
+                'first_name': '',
+                'last_name': '',
+            }
+
+    def named_rows(self, count, names, slug):
+        for pk in range(1, count + 1):
+            name = names[(pk - 1) % len(names)]
+            if pk > len(names):
+                name = f'{name} {(pk - 1) // len(names) + 1}'
+            yield {'id': pk, 'name': name, 'slug': f'{slug}-{pk}'}
+
+    def category_rows(self):
+        return self.named_rows(self.categories, CATEGORY_NAMES, 'category')
+
+    def genre_rows(self):
+        return self.named_rows(self.genres, GENRE_NAMES, 'genre')
+
+    def title_rows(self):
+        rng = self.rng('titles')
+        for pk in range(1, self.titles + 1):
+            yield {
+                'id': pk,
+                'name': self.words(rng, 1, 4).capitalize(),
+                'year': LAST_YEAR - zipf_rank(
+                    rng, LAST_YEAR - FIRST_YEAR + 1, 0.5
+                ) + 1,
+                'description': self.words(rng, 5, 30),
+                'category_id': zipf_rank(rng, self.categories, self.skew),
+            }
+
+    def genre_title_rows(self):
+        rng = self.rng('genre_title')
+        pk = 0
+        for title_id in range(1, self.titles + 1):
+            genres = {
+                zipf_rank(rng, self.genres, self.skew)
+                for _ in range(rng.randint(1, self.max_genres))
+            }
+            for genre_id in sorted(genres):
+                pk += 1
+                yield {'id': pk, 'title_id': title_id, 'genre_id': genre_id}
+
+    def reviews_per_title(self):
+        """Количество отзывов каждого произведения (индекс — id - 1)."""
+        rng = self.rng('reviews_per_title')
+        counts = array('L', bytes(array('L').itemsize * self.titles))
+        for _ in range(self.reviews):
+            index = self.title_ids(zipf_rank(rng, self.titles, self.skew)) - 1
+            # У произведения не больше отзывов, чем пользователей: лишний
+            # отзыв достаётся следующему неполному произведению.
+            while counts[index] >= self.users:
+                index = (index + 1) % self.titles
+            counts[index] += 1
+        return counts
+
+    def review_rows(self):
+        rng = self.rng('reviews')
+        stride = coprime(self.users, self.users // 2 + 1)
+        pk = 0
+        for title_id, count in enumerate(self.reviews_per_title(), 1):
+            # Авторы одного произведения различны: шаг взаимно прост с
+            # числом пользователей, а отзывов не больше, чем пользователей.
+            first = self.user_ids(zipf_rank(rng, self.users, self.skew))
+            quality = rng.uniform(2, 10)
+            for number in range(count):
+                pk += 1
+                yield {
+                    'id': pk,
+                    'title_id': title_id,
+                    'text': self.words(rng, 5, 40),
+                    'author_id': (first - 1 + number * stride)
+                    % self.users + 1,
+                    'score': min(10, max(1, round(rng.gauss(quality, 2)))),
+                    'pub_date': self.date(rng),
+                }
+
+    def comment_rows(self):
+        rng = self.rng('comments')
+        if not self.reviews:
+            return
+        review_ids = Scatter(self.reviews)
+        for pk in range(1, self.comments + 1):
+            yield {
+                'id': pk,
+                'review_id': review_ids(
+                    zipf_rank(rng, self.reviews, self.skew)
+                ),
+                'text': self.words(rng, 3, 25),
+                'author_id': self.user_ids(
+                    zipf_rank(rng, self.users, self.skew)
+                ),
+                'pub_date': self.date(rng),
+            }
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические данные заданного объёма в базу '
+        'или в CSV-файлы для load_data'
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('users', 1000, 'пользователей'),
+            ('categories', 5, 'категорий'),
+            ('genres', 20, 'жанров'),
+            ('titles', 10000, 'произведений'),
+            ('reviews', 100000, 'отзывов'),
+            ('comments', 100000, 'комментариев'),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Количество {help_text}',
+            )
+        parser.add_argument(
+            '--max-genres', type=int, default=3,
+            help='Наибольшее количество жанров у произведения',
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель распределения Ципфа для популярности',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=1,
+            help='Начальное значение генератора случайных чисел',
+        )
+        parser.add_argument(
+            '--output-dir',
+            help='Записать CSV-файлы в каталог вместо загрузки в базу',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество строк, вставляемых одним запросом',
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'categories', 'genres', 'titles'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} должно быть больше нуля.')
+        if options['reviews'] > options['users'] * options['titles']:
+            raise CommandError(
+                'Отзывов не может быть больше, чем пользователей, '
+                'умноженных на произведения.'
+            )
+        generator = Generator(
+            options['seed'], options['users'], options['categories'],
+            options['genres'], options['titles'], options['reviews'],
+            options['comments'], options['max_genres'], options['skew'],
+        )
+        verbosity = int(options['verbosity'])
+        if options['output_dir']:
+            os.makedirs(options['output_dir'], exist_ok=True)
+            write = self.write_csv
+        else:
+            write = self.write_db
+        with bulk_load_pragmas():
+            if not options['output_dir']:
+                clear_tables(TABLES)
+            for model, file_name in TABLES:
+                started = perf_counter()
+                count = write(
+                    model, file_name, generator.rows(model), options
+                )
+                if verbosity > 0:
+                    elapsed = perf_counter() - started
+                    self.stdout.write(self.style.SUCCESS(
+                        f'{file_name} - {count} строк за {elapsed:.2f} с'
+                    ))
+        if not options['output_dir']:
+            bump_versions(*sorted(set(CACHED_RESOURCES.values())))
+
+    def write_csv(self, model, file_name, rows, options):
+        count = 0
+        path = os.path.join(options['output_dir'], file_name)
+        with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = None
+            for row in rows:
+                if writer is None:
+                    writer = csv.writer(csv_file)
+                    writer.writerow(row)
+                writer.writerow(
+                    value.isoformat() if isinstance(value, datetime)
+                    else value
+                    for value in row.values()
+                )
+                count += 1
+        return count
+
+    def write_db(self, model, file_name, rows, options):
+        loader = LoadData(stdout=self.stdout, stderr=self.stderr)
+        stats = loader.write_table(
+            model, batches(rows, options['batch_size']),
+            {'upsert': False}, verbosity=0
+        )
+        return stats.created
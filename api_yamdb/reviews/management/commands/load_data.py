@@ -1,8 +1,18 @@
-import csv
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from tempfile import TemporaryDirectory
+from time import perf_counter
 
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
 
+from api.cache import VERSIONED_MODELS, bump_versions
+from reviews.csv_parsing import init_worker, parse_table, spooled_batches
 from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.ratings import recompute_ratings
 
 TABLES = (
     (User, 'users.csv'),
@@ -13,35 +23,357 @@ TABLES = (
     (Review, 'review.csv'),
     (Comment, 'comments.csv'),
 )
+# Версии кеша ответов API, которые сбрасываются при изменении таблиц.
+CACHED_RESOURCES = {**VERSIONED_MODELS, Title.genre.through: 'title'}
+BATCH_SIZE = 1000
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+# На время загрузки SQLite не ждёт fsync и держит больше страниц в памяти.
+SQLITE_BULK_PRAGMAS = {
+    'synchronous': 'OFF',
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+@contextmanager
+def bulk_load_pragmas():
+    """Временно выставляет SQLITE_BULK_PRAGMAS и восстанавливает прежние."""
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        saved = {}
+        for pragma, value in SQLITE_BULK_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {pragma}')
+            saved[pragma] = cursor.fetchone()[0]
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+        try:
+            yield
+        finally:
+            for pragma, value in saved.items():
+                cursor.execute(f'PRAGMA {pragma} = {value}')
+
+
+def dependency_order(tables):
+    """Таблицы в порядке зависимостей по внешним ключам моделей.
+
+    Независимые таблицы сохраняют исходный порядок.
+    """
+    models = [model for model, _ in tables]
+    dependencies = {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    ordered = []
+    while len(ordered) < len(tables):
+        ready = [
+            (model, file_name) for model, file_name in tables
+            if (model, file_name) not in ordered
+            and dependencies[model] <= {model for model, _ in ordered}
+        ]
+        if not ready:
+            raise CommandError('Циклическая зависимость между таблицами.')
+        ordered += ready
+    return ordered
+
+
+def clear_tables(tables):
+    """Очищает таблицы перед полной загрузкой, начиная с зависимых.
+
+    Таблицы, на которые ссылаются только другие таблицы из tables,
+    очищаются одним DELETE без обхода каскадов и сигналов в Python:
+    зависимые от них к этому моменту уже пусты.
+    """
+    models = [model for model, _ in tables]
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model, _ in reversed(dependency_order(tables)):
+            referencing = {
+                field.related_model
+                for field in model._meta.get_fields(include_hidden=True)
+                if field.auto_created and not field.concrete
+            }
+            if referencing <= set(models):
+                cursor.execute(
+                    'DELETE FROM '
+                    f'{connection.ops.quote_name(model._meta.db_table)}'
+                )
+            else:
+                model.objects.all().delete()
+
+
+class InlineExecutor(Executor):
+    """Выполняет задачи сразу в текущем процессе (--workers 1)."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+
+def parsing_pool(workers):
+    if workers <= 1:
+        return InlineExecutor()
+    return ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE'),),
+    )
 
 
 class Command(BaseCommand):
     help = 'Загружает тестовые данные (./static/data/*.csv) в db.sqlite3'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество строк, вставляемых одним запросом',
+        )
+        parser.add_argument(
+            '--data-dir',
+            default=DATA_DIR,
+            help='Каталог с CSV-файлами',
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Не очищать таблицы: добавить новые строки и обновить '
+                'изменившиеся, сравнивая их по первичному ключу'
+            ),
+        )
+        parser.add_argument(
+            '--delete-missing',
+            action='store_true',
+            help='В режиме --upsert удалить строки, которых нет в CSV',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=min(len(TABLES), os.cpu_count() or 1),
+            help='Количество процессов, разбирающих CSV-файлы',
+        )
+
     def handle(self, *args, **options):
         verbosity = int(options['verbosity'])
-        for model, file_name in TABLES:
-            file_path = './static/data/' + file_name
-            try:
-                with open(file_path, 'rt', encoding='utf-8') as csv_file:
-                    reader = csv.reader(csv_file, delimiter=',', quotechar='"')
-                    header = next(reader)
-                    model.objects.all().delete()
-                    bulk_objs = []
-                    for row in reader:
-                        kwargs = {
-                            key: value for key, value in zip(header, row)
-                        }
-                        if verbosity > 1:
-                            self.stdout.write(str(kwargs))
-                        bulk_objs.append(model(**kwargs))
-                    model.objects.bulk_create(bulk_objs)
-                    if verbosity > 0:
-                        self.stdout.write(
-                            self.style.SUCCESS(f'{file_name} - done')
-                        )
-            except Exception as error:
-                raise CommandError(
-                    f'При загрузке файла {file_name} произошла ошибка.'
-                    f'\r\n{error}'
+        if options['delete_missing'] and not options['upsert']:
+            raise CommandError('--delete-missing работает только с --upsert.')
+        started = perf_counter()
+        tables = dependency_order(TABLES)
+        changed_resources = set()
+        # CSV-файлы разбираются и проверяются в пуле процессов, пока
+        # единственный писатель вставляет уже разобранные таблицы в
+        # порядке зависимостей.
+        with TemporaryDirectory() as spool_dir, parsing_pool(
+            options['workers']
+        ) as pool, bulk_load_pragmas():
+            if not options['upsert']:
+                clear_tables(TABLES)
+            parsed = {
+                file_name: pool.submit(
+                    parse_table, model._meta.label,
+                    os.path.join(options['data_dir'], file_name),
+                    options['batch_size'], spool_dir,
                 )
+                for model, file_name in tables
+            }
+            for model, file_name in tables:
+                waiting = perf_counter()
+                try:
+                    spool_path, rows, parse_time = parsed[file_name].result()
+                    waiting = perf_counter() - waiting
+                    writing = perf_counter()
+                    stats = self.write_table(
+                        model, spooled_batches(spool_path), options,
+                        verbosity
+                    )
+                except Exception as error:
+                    for future in parsed.values():
+                        future.cancel()
+                    raise CommandError(
+                        f'При загрузке файла {file_name} произошла ошибка.'
+                        f'\r\n{error}'
+                    )
+                if stats.changed and model in CACHED_RESOURCES:
+                    changed_resources.add(CACHED_RESOURCES[model])
+                writing = perf_counter() - writing
+                if verbosity > 0:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'{file_name} - done: {stats}; разбор '
+                        f'{parse_time:.2f} с, ожидание {waiting:.2f} с, '
+                        f'запись {writing:.2f} с '
+                        f'({rows / max(writing, 1e-6):.0f} строк/с)'
+                    ))
+        # bulk-операции не отправляют сигналы, сбрасываем кеш ответов API.
+        bump_versions(*sorted(changed_resources))
+        if verbosity > 0:
+            self.stdout.write(self.style.SUCCESS(
+                f'Всего: {perf_counter() - started:.2f} с'
+            ))
+
+    def write_table(self, model, rows, options, verbosity):
+        if options['upsert']:
+            stats = self.upsert_table(
+                model, rows, options['batch_size'],
+                options['delete_missing'], verbosity
+            )
+        else:
+            stats = self.load_table(model, rows, verbosity)
+        if stats.changed:
+            self.update_dependents(model, stats)
+        return stats
+
+    def update_dependents(self, model, stats):
+        """Обновляет то, что сигналы обновили бы при сохранении по одному."""
+        if model is Review:
+            # bulk_create и bulk_update не вызывают Review.save().
+            if stats.parents is None:
+                recompute_ratings()
+                return
+            title_ids = sorted(stats.parents['title_id'])
+            for start in range(0, len(title_ids), BATCH_SIZE):
+                recompute_ratings(Title.objects.filter(
+                    pk__in=title_ids[start:start + BATCH_SIZE]
+                ))
+        elif model is Comment and stats.parents is not None:
+            review_ids = sorted(stats.parents['review_id'])
+            for start in range(0, len(review_ids), BATCH_SIZE):
+                Review.objects.filter(
+                    pk__in=review_ids[start:start + BATCH_SIZE]
+                ).update(changed_at=timezone.now())
+
+    def load_table(self, model, rows, verbosity):
+        """Вставляет пачки rows в очищенную таблицу модели в транзакции.
+
+        Пачки читаются по одной, поэтому память не растёт с размером
+        файла.
+        """
+        stats = TableStats()
+        with transaction.atomic():
+            for batch in rows:
+                if verbosity > 1:
+                    for kwargs in batch:
+                        self.stdout.write(str(kwargs))
+                model.objects.bulk_create(
+                    [model(**kwargs) for kwargs in batch]
+                )
+                stats.created += len(batch)
+        return stats
+
+    def upsert_table(self, model, rows, batch_size, delete_missing, verbosity):
+        """Синхронизирует таблицу модели с пачками rows по первичному ключу.
+
+        Для каждой пачки строк существующие записи читаются одним
+        запросом; новые вставляются, изменившиеся обновляются через
+        bulk_update, совпадающие не трогаются. Поля auto_now изменённых
+        записей обновляются явно.
+        """
+        stats = TableStats(parents={
+            field.attname: set() for field in model._meta.concrete_fields
+            if field.is_relation
+        })
+        auto_now = [
+            field.attname for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False)
+        ]
+        seen = set()
+        with transaction.atomic():
+            for batch in rows:
+                # Поля auto_now_add при вставке всё равно заполняются
+                # текущим временем, поэтому из CSV не сравниваются.
+                fields = [
+                    name for name in batch[0]
+                    if name != model._meta.pk.attname
+                    and not getattr(
+                        model._meta.get_field(name), 'auto_now_add', False
+                    )
+                ]
+                incoming = {}
+                for kwargs in batch:
+                    if verbosity > 1:
+                        self.stdout.write(str(kwargs))
+                    obj = model(**kwargs)
+                    incoming[obj.pk] = obj
+                existing = model.objects.in_bulk(list(incoming))
+                to_create = []
+                to_update = []
+                now = timezone.now()
+                for pk, obj in incoming.items():
+                    old = existing.get(pk)
+                    if old is None:
+                        to_create.append(obj)
+                    elif any(getattr(old, name) != getattr(obj, name)
+                             for name in fields):
+                        for name in auto_now:
+                            setattr(obj, name, now)
+                        to_update.append(obj)
+                        stats.add_parents(old)
+                    else:
+                        continue
+                    stats.add_parents(obj)
+                model.objects.bulk_create(to_create)
+                model.objects.bulk_update(
+                    to_update, fields + auto_now, batch_size=batch_size
+                )
+                stats.created += len(to_create)
+                stats.updated += len(to_update)
+                stats.unchanged += len(incoming) - len(to_create) - len(
+                    to_update
+                )
+                if delete_missing:
+                    seen.update(incoming)
+            if delete_missing:
+                self.delete_missing(model, seen, batch_size, stats)
+        return stats
+
+    def delete_missing(self, model, seen, batch_size, stats):
+        pks = model.objects.order_by('pk').values_list('pk', flat=True)
+        missing = [pk for pk in pks.iterator() if pk not in seen]
+        for start in range(0, len(missing), batch_size):
+            chunk = model.objects.filter(
+                pk__in=missing[start:start + batch_size]
+            )
+            if stats.parents:
+                for obj in chunk.only(*stats.parents):
+                    stats.add_parents(obj)
+            chunk.delete()
+        stats.deleted += len(missing)
+
+
+class TableStats:
+    """Счётчики загрузки таблицы и id связанных записей, которых она
+    коснулась (parents is None — затронуты все)."""
+
+    def __init__(self, parents=None):
+        self.created = self.updated = self.unchanged = self.deleted = 0
+        self.parents = parents
+
+    @property
+    def changed(self):
+        if self.parents is None:
+            return True
+        return bool(self.created or self.updated or self.deleted)
+
+    @property
+    def rows(self):
+        return self.created + self.updated + self.unchanged
+
+    def add_parents(self, obj):
+        for attname, ids in self.parents.items():
+            ids.add(getattr(obj, attname))
+
+    def __str__(self):
+        if self.parents is None:
+            return f'{self.created} строк'
+        return (
+            f'добавлено {self.created}, обновлено {self.updated}, '
+            f'без изменений {self.unchanged}, удалено {self.deleted}'
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import VERSIONED_MODELS, bump_versions
+from reviews.models import Title
+from reviews.ratings import RECOMPUTE_CHUNK_SIZE, recompute_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг произведений по таблице отзывов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RECOMPUTE_CHUNK_SIZE,
+            help='Количество произведений, обновляемых за одну транзакцию',
+        )
+
+    def handle(self, *args, **options):
+        updated = recompute_ratings(chunk_size=options['chunk_size'])
+        # UPDATE не отправляет сигналы, сбрасываем кеш ответов API.
+        bump_versions(VERSIONED_MODELS[Title])
+        if int(options['verbosity']) > 0:
+            self.stdout.write(
+                self.style.SUCCESS(f'Обновлено произведений: {updated}')
+            )
@@ -0,0 +1,50 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import MAX_ATTEMPTS, SEND_BATCH_SIZE, send_outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих писем'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SEND_BATCH_SIZE,
+            help='Количество писем, читаемых из очереди за раз',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='Число попыток, после которого письмо больше не отправляется',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Проверять очередь каждые --interval секунд без завершения',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди в режиме --loop',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_outbox(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+            )
+            if int(options['verbosity']) > 0 and (
+                sent or failed or not options['loop']
+            ):
+                self.stdout.write(self.style.SUCCESS(
+                    f'Отправлено писем: {sent}, ошибок: {failed}'
+                ))
+            if not options['loop']:
+                break
+            sleep(options['interval'])
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:54
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rating_aggregate(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    aggregates = (
+        Review.objects.order_by().values('title_id')
+        .annotate(total=Sum('score'), count=Count('pk'))
+    )
+    for row in aggregates.iterator():
+        Title.objects.filter(pk=row['title_id']).update(
+            score_sum=row['total'],
+            reviews_count=row['count'],
+            rating=row['total'] / row['count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_auto_20220930_0132'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='reviews_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(
+            fill_rating_aggregate, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.search import create_title_fts, drop_title_fts
+
+
+def forwards(apps, schema_editor):
+    create_title_fts(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    drop_title_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_title_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
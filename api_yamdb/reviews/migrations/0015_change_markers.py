@@ -0,0 +1,33 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+from reviews.search import create_title_fts
+
+
+def restore_title_fts(apps, schema_editor):
+    # AddField пересоздаёт таблицу reviews_title в SQLite вместе с
+    # триггерами полнотекстового индекса.
+    create_title_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_title_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='changed_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата изменения отзыва или его комментариев'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='changed_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата изменения произведения или его отзывов'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(restore_title_fts, migrations.RunPython.noop),
+    ]
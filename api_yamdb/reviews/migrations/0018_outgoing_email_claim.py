@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0017_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claim_token',
+            field=models.CharField(blank=True, max_length=32, verbose_name='Метка отправляющего процесса'),
+        ),
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взято в отправку'),
+        ),
+    ]
@@ -3,8 +3,14 @@ from datetime import datetime as dt
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-
+from django.db import models, transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import ratings
 from .validators import username_validator
 
 
@@ -92,6 +98,10 @@ class Genre(CategoryGenreBase):
         verbose_name_plural = 'Жанры'
 
 
+# Поля Title, которые хранят агрегат по отзывам.
+RATING_FIELDS = ('score_sum', 'reviews_count', 'rating')
+
+
 def get_current_year():
     return dt.now().year
 
@@ -125,15 +135,63 @@ class Title(models.Model):
         verbose_name='Жанр',
         related_name='titles'
     )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False
+    )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов', default=0, editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг', null=True, blank=True, editable=False
+    )
+    changed_at = models.DateTimeField(
+        'Дата изменения произведения или его отзывов', auto_now=True
+    )
 
     class Meta:
         ordering = ('name',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=['-rating', 'name'], name='title_rating_name_idx'
+            ),
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(
+                fields=['category', '-rating', 'name'],
+                name='title_category_rating_idx'
+            ),
+            models.Index(
+                fields=['category', 'name'], name='title_category_name_idx'
+            ),
+            models.Index(
+                fields=['year', '-rating', 'name'],
+                name='title_year_rating_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name[:30]
 
+    def save(self, *args, **kwargs):
+        # Сумму оценок, число отзывов и рейтинг меняют только
+        # ratings.apply_review_delta() и recompute_ratings(): значения в
+        # памяти могли устареть, пока произведение редактировали.
+        if (
+            not self._state.adding and not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in RATING_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class NoticeModel(models.Model):
     pub_date = models.DateTimeField(
@@ -164,6 +222,9 @@ class Review(NoticeModel):
         verbose_name='Произведение',
         help_text='Выберите произведение',
     )
+    changed_at = models.DateTimeField(
+        'Дата изменения отзыва или его комментариев', auto_now=True
+    )
     score = models.IntegerField(
         verbose_name='Оценка',
         help_text='Укажите оценку произведения (от 1 до 10)',
@@ -186,6 +247,59 @@ class Review(NoticeModel):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date'], name='review_title_date_idx'
+            ),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._remember_rating_state()
+
+    def _remember_rating_state(self):
+        if self._state.adding and self.pk is None:
+            self._saved_rating_state = (None, None)
+        elif 'title_id' in self.__dict__ and 'score' in self.__dict__:
+            self._saved_rating_state = (self.title_id, self.score)
+        else:
+            # Поля отложены (only()/defer()) или pk задан вручную:
+            # сохранённые значения читаются из базы перед записью.
+            self._saved_rating_state = None
+
+    def saved_rating_state(self):
+        """Произведение и оценка отзыва в базе; (None, None) — отзыва
+        в базе нет."""
+        if self._saved_rating_state is None:
+            self._saved_rating_state = Review.objects.filter(
+                pk=self.pk
+            ).values_list('title_id', 'score').first() or (None, None)
+        return self._saved_rating_state
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_rating_state()
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            saved_state = self.saved_rating_state()
+            super().save(*args, **kwargs)
+            ratings.review_saved(self, *saved_state)
+        self._remember_rating_state()
+
+
+@receiver(pre_delete, sender=Review)
+def remember_rating_before_review_delete(sender, instance, **kwargs):
+    # После удаления строки отложенные поля уже не прочитать.
+    instance.saved_rating_state()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    # Collector.delete шлёт post_delete внутри своей транзакции.
+    ratings.review_deleted(*instance.saved_rating_state())
 
 
 class Comment(NoticeModel):
@@ -199,3 +313,82 @@ class Comment(NoticeModel):
     class Meta(NoticeModel.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date'], name='comment_review_date_idx'
+            ),
+        ]
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_review_on_comment_change(sender, instance, **kwargs):
+    Review.objects.filter(pk=instance.review_id).update(
+        changed_at=timezone.now()
+    )
+
+
+@receiver(pre_save, sender=User)
+def check_username_change(sender, instance, raw=False, update_fields=None,
+                          **kwargs):
+    instance._username_changed = not (
+        raw or instance._state.adding
+        or update_fields is not None and 'username' not in update_fields
+        or User.objects.filter(
+            pk=instance.pk, username=instance.username
+        ).exists()
+    )
+
+
+@receiver(post_save, sender=User)
+def touch_authored_on_username_change(sender, instance, **kwargs):
+    # Имя автора входит в списки отзывов и комментариев: их ETag и
+    # Last-Modified строятся по отметкам изменения произведения и отзыва.
+    if not getattr(instance, '_username_changed', False):
+        return
+    instance._username_changed = False
+    now = timezone.now()
+    Title.objects.filter(reviews__author=instance).update(changed_at=now)
+    Review.objects.filter(comments__author=instance).update(changed_at=now)
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (outbox).
+
+    Записывается в той же транзакции, что и изменения, к которым
+    относится; отправляется командой send_outbox.
+    """
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField(
+        'Отправитель', max_length=settings.EMAIL_MAX_LENGTH
+    )
+    to = models.EmailField('Получатель', max_length=settings.EMAIL_MAX_LENGTH)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(
+        'Попыток отправки', default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    claimed_at = models.DateTimeField(
+        'Взято в отправку', null=True, blank=True
+    )
+    claim_token = models.CharField(
+        'Метка отправляющего процесса', max_length=32, blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt_at', 'id')
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                name='outgoing_email_due_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
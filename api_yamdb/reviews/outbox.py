@@ -0,0 +1,119 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+SEND_BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+# Задержка перед повторной попыткой удваивается: 30 с, 1 мин, 2 мин...
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 3600
+# Письма, взятые в отправку процессом, который за это время не отправил
+# их и не вернул в очередь (например, завершился аварийно), снова
+# доступны другим процессам.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue_mail(subject, body, from_email, recipients):
+    """Ставит письмо каждому получателю в очередь на отправку."""
+    OutgoingEmail.objects.bulk_create(
+        OutgoingEmail(
+            subject=subject, body=body, from_email=from_email, to=recipient
+        )
+        for recipient in recipients
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(
+        RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY
+    ))
+
+
+def pending_emails(max_attempts=MAX_ATTEMPTS):
+    now = timezone.now()
+    return OutgoingEmail.objects.filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - CLAIM_TIMEOUT),
+        next_attempt_at__lte=now, attempts__lt=max_attempts,
+    )
+
+
+def claim_batch(max_attempts, last_id, batch_size, token):
+    """Берёт в отправку до batch_size писем после last_id.
+
+    Условный UPDATE повторно проверяет, что письмо никем не взято, поэтому
+    параллельные send_outbox не отправят одно письмо дважды. Возвращает
+    id последнего просмотренного письма и письма, взятые этим процессом.
+    """
+    with transaction.atomic():
+        ids = list(pending_emails(max_attempts).filter(
+            id__gt=last_id
+        ).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return None, []
+        pending_emails(max_attempts).filter(id__in=ids).update(
+            claimed_at=timezone.now(), claim_token=token
+        )
+    return ids[-1], list(
+        OutgoingEmail.objects.filter(id__in=ids, claim_token=token)
+    )
+
+
+def send_outbox(batch_size=SEND_BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """Отправляет накопившиеся письма пачками через одно соединение.
+
+    Каждая пачка сначала берётся в отправку (claim_batch). Отправленные
+    письма удаляются из очереди, для неотправленных увеличивается
+    счётчик попыток и откладывается следующая попытка.
+    Возвращает пару (отправлено, ошибок).
+    """
+    sent = failed = 0
+    token = uuid4().hex
+    connection = get_connection()
+    try:
+        last_id = 0
+        while True:
+            # Отложенные в этом проходе письма уходят из выборки, поэтому
+            # пачки идут по id, а не с начала очереди.
+            last_id, batch = claim_batch(
+                max_attempts, last_id, batch_size, token
+            )
+            if last_id is None:
+                break
+            sent_ids = []
+            for email in batch:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email, [email.to],
+                    connection=connection,
+                )
+                try:
+                    connection.open()
+                    message.send()
+                except Exception as error:
+                    # После ошибки соединение могло оборваться; следующее
+                    # письмо откроет его заново.
+                    connection.close()
+                    email.attempts += 1
+                    email.next_attempt_at = (
+                        timezone.now() + retry_delay(email.attempts)
+                    )
+                    email.last_error = repr(error)
+                    email.claimed_at = None
+                    email.claim_token = ''
+                    email.save(update_fields=(
+                        'attempts', 'next_attempt_at', 'last_error',
+                        'claimed_at', 'claim_token',
+                    ))
+                    failed += 1
+                else:
+                    sent_ids.append(email.id)
+            OutgoingEmail.objects.filter(id__in=sent_ids).delete()
+            sent += len(sent_ids)
+    finally:
+        connection.close()
+    return sent, failed
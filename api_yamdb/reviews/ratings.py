@@ -0,0 +1,85 @@
+from django.db.models import (
+    Avg, Case, Count, ExpressionWrapper, F, FloatField, OuterRef, Subquery,
+    Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+RECOMPUTE_CHUNK_SIZE = 1000
+
+
+def apply_review_delta(title_id, score_delta, count_delta):
+    """Сдвигает сумму оценок и число отзывов произведения одним UPDATE.
+
+    Заодно обновляет отметку изменения произведения, по которой строятся
+    ETag списка отзывов.
+    """
+    from reviews.models import Title
+
+    score_sum = F('score_sum') + score_delta
+    reviews_count = F('reviews_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        score_sum=score_sum,
+        reviews_count=reviews_count,
+        changed_at=timezone.now(),
+        rating=Case(
+            When(reviews_count=-count_delta, then=Value(None)),
+            default=ExpressionWrapper(
+                Cast(score_sum, FloatField()) / reviews_count,
+                output_field=FloatField(),
+            ),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def review_saved(review, saved_title_id, saved_score):
+    """Переносит изменения отзыва относительно сохранённой версии."""
+    if saved_title_id is None:
+        apply_review_delta(review.title_id, review.score, 1)
+    elif saved_title_id != review.title_id:
+        apply_review_delta(saved_title_id, -saved_score, -1)
+        apply_review_delta(review.title_id, review.score, 1)
+    else:
+        apply_review_delta(review.title_id, review.score - saved_score, 0)
+
+
+def review_deleted(saved_title_id, saved_score):
+    if saved_title_id is None or saved_score is None:
+        return
+    apply_review_delta(saved_title_id, -saved_score, -1)
+
+
+def recompute_ratings(titles=None, chunk_size=RECOMPUTE_CHUNK_SIZE):
+    """Пересчитывает рейтинг по таблице отзывов порциями по chunk_size.
+
+    Каждая порция обновляется одним UPDATE с коррелированными
+    подзапросами к отзывам по индексу (title, pub_date).
+    """
+    from reviews.models import Review, Title
+
+    if titles is None:
+        titles = Title.objects.all()
+    pks = titles.order_by('pk').values_list('pk', flat=True)
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    last_pk = 0
+    updated = 0
+    while True:
+        chunk = list(pks.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return updated
+        updated += Title.objects.filter(pk__in=chunk).update(
+            score_sum=Coalesce(Subquery(
+                reviews.annotate(total=Sum('score')).values('total')
+            ), 0),
+            reviews_count=Coalesce(Subquery(
+                reviews.annotate(count=Count('pk')).values('count')
+            ), 0),
+            rating=Subquery(
+                reviews.annotate(average=Avg('score')).values('average')
+            ),
+            changed_at=timezone.now(),
+        )
+        last_pk = chunk[-1]
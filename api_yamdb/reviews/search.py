@@ -0,0 +1,100 @@
+import re
+
+from django.db.models.expressions import RawSQL
+
+TITLE_FTS_TABLE = 'reviews_title_fts'
+
+CREATE_TITLE_FTS = f'''
+CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_FTS_TABLE} USING fts5(
+    name, description,
+    content='reviews_title', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)
+'''
+
+# Триггеры держат индекс в актуальном состоянии при любых изменениях
+# таблицы, включая bulk_create и update(); обновление рейтинга индекс
+# не затрагивает. SQLite пересоздаёт таблицу при AddField/AlterField
+# модели Title, вместе с ней пропадают и триггеры: такие миграции должны
+# заново вызывать create_title_fts().
+CREATE_TITLE_FTS_TRIGGERS = (
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_ai
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_ad
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}(
+            {TITLE_FTS_TABLE}, rowid, name, description
+        ) VALUES ('delete', old.id, old.name, old.description);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_au
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}(
+            {TITLE_FTS_TABLE}, rowid, name, description
+        ) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    ''',
+)
+
+REBUILD_TITLE_FTS = (
+    f"INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}) VALUES ('rebuild')"
+)
+
+DROP_TITLE_FTS = (
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {TITLE_FTS_TABLE}',
+)
+
+
+def create_title_fts(schema_editor):
+    """Создаёт индекс и триггеры (только SQLite) и заполняет индекс."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_TITLE_FTS)
+    for sql in CREATE_TITLE_FTS_TRIGGERS:
+        schema_editor.execute(sql)
+    schema_editor.execute(REBUILD_TITLE_FTS)
+
+
+def drop_title_fts(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_TITLE_FTS:
+        schema_editor.execute(sql)
+
+
+def build_match_query(text):
+    """Превращает пользовательский ввод в безопасный запрос MATCH.
+
+    Каждое слово ищется как префикс, слова объединяются через AND.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+class MatchingRowids(RawSQL):
+    """Подзапрос rowid записей индекса, подходящих под запрос MATCH.
+
+    Предназначен для `pk__in`: RawSQL оборачивает SQL в скобки, и
+    SQLite принял бы `IN ((SELECT ...))` за скалярный подзапрос.
+    """
+
+    def __init__(self, match):
+        super().__init__(
+            f'SELECT rowid FROM {TITLE_FTS_TABLE} '
+            f'WHERE {TITLE_FTS_TABLE} MATCH %s',
+            [match],
+        )
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
@@ -32,5 +32,6 @@ if FILENAME not in project_dir_content:
 assert get_version() < '3.0.0', 'Пожалуйста, используйте версию Django < 3.0.0'
 
 pytest_plugins = [
+    'tests.fixtures.fixture_cache',
     'tests.fixtures.fixture_user',
 ]
@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def throttle_store(tmp_path_factory):
+    # Счётчики ограничения частоты хранятся в отдельном файле, а не в
+    # общем THROTTLE_STORE_PATH запущенного локально сервера.
+    from django.test import override_settings
+
+    from api.throttling import _stores
+
+    settings = override_settings(THROTTLE_STORE_PATH=str(
+        tmp_path_factory.mktemp('throttle') / 'throttle.sqlite3'
+    ))
+    settings.enable()
+    _stores.clear()
+    yield
+    settings.disable()
+    _stores.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Очистка тестовой БД не отправляет сигналы, поэтому кеши ответов и
+    # вариантов фильтров, состояние пользователей для токенов и счётчики
+    # ограничения частоты запросов сбрасываются перед каждым тестом явно.
+    from django.core.cache import caches
+
+    from api.authentication import _auth_state_cache
+    from api.filters import _choices_cache
+    from api.throttling import get_bucket_store
+
+    for cache in caches.all():
+        cache.clear()
+    _choices_cache.clear()
+    _auth_state_cache.clear()
+    get_bucket_store().clear()
@@ -0,0 +1,124 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test08Rating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_after_delete(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        auth_client(moderator).delete(f'{url}reviews/{reviews[0]["id"]}/')
+        data = admin_client.get(url).json()
+        assert data.get('rating') == 3, (
+            'Проверьте, что после DELETE запроса '
+            '`/api/v1/titles/{title_id}/reviews/{review_id}/` '
+            'значение `rating` произведения пересчитывается'
+        )
+        for review in reviews[1:]:
+            admin_client.delete(f'{url}reviews/{review["id"]}/')
+        data = admin_client.get(url).json()
+        assert data.get('rating') is None, (
+            'Проверьте, что после удаления всех отзывов '
+            '`rating` произведения равен `None`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_recompute_ratings(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.update(score_sum=0, reviews_count=0, rating=None)
+        url = f'/api/v1/titles/?name={titles[0]["name"]}'
+        assert admin_client.get(url).json()['results'][0]['rating'] is None
+        call_command('recompute_ratings', chunk_size=1, verbosity=0)
+        assert admin_client.get(url).json()['results'][0]['rating'] == 4, (
+            'Проверьте, что команда `recompute_ratings` сбрасывает кеш '
+            'ответов API'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.reviews_count) == (12, 3), (
+            'Проверьте, что команда `recompute_ratings` '
+            'пересчитывает сумму оценок и количество отзывов'
+        )
+        assert title.rating == 4, (
+            'Проверьте, что команда `recompute_ratings` пересчитывает `rating`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rating_with_genre_filter(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        for genre in titles[0]['genre']:
+            data = client.get(f'/api/v1/titles/?genre={genre}').json()
+            assert data['count'] == 1, (
+                'Проверьте, что фильтр `genre` `/api/v1/titles/` '
+                'не размножает произведения'
+            )
+            assert data['results'][0]['rating'] == 4, (
+                'Проверьте, что при фильтре `genre` `/api/v1/titles/` '
+                'возвращается правильное значение `rating`'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_rating_with_deferred_fields(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        review = Review.objects.only('text').get(pk=reviews[0]['id'])
+        review.text = 'Новый текст'
+        review.save()
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.reviews_count) == (12, 3), (
+            'Проверьте, что сохранение отзыва с отложенными полями '
+            'не считается новым отзывом'
+        )
+        review = Review.objects.defer('score').get(pk=reviews[1]['id'])
+        review.score = 10
+        review.save()
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.reviews_count) == (19, 3), (
+            'Проверьте, что изменение оценки отзыва с отложенными полями '
+            'учитывается в рейтинге'
+        )
+        Review.objects.only('id').get(pk=reviews[2]['id']).delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.reviews_count) == (15, 2), (
+            'Проверьте, что удаление отзыва с отложенными полями '
+            'пересчитывает рейтинг'
+        )
+        Review.objects.filter(title_id=title_id).only('id').delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.reviews_count, title.rating) == (
+            0, 0, None
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_title_save_keeps_rating(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        Review.objects.filter(pk=reviews[1]['id']).delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.reviews_count) == (9, 2)
+        response = auth_client(user).post(
+            f'/api/v1/titles/{title_id}/reviews/',
+            data={'text': 'Снова', 'score': 10},
+        )
+        assert response.status_code == 201
+        title.name = 'Новое название'
+        title.save()
+        title = Title.objects.get(pk=title_id)
+        assert title.name == 'Новое название'
+        assert (title.score_sum, title.reviews_count) == (19, 3), (
+            'Проверьте, что сохранение произведения не затирает сумму '
+            'оценок и количество отзывов, изменённые после его загрузки'
+        )
+        response = admin_client.patch(
+            f'/api/v1/titles/{title_id}/', data={'year': 1990}
+        )
+        assert response.status_code == 200
+        assert Title.objects.get(pk=title_id).reviews_count == 3
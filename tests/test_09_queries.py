@@ -0,0 +1,119 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_comments, create_titles
+
+
+class Test09Queries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_list_queries_are_constant(
+        self, client, admin_client, admin, django_assert_max_num_queries
+    ):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        urls = {
+            '/api/v1/titles/': 3,
+            f'/api/v1/titles/{title_id}/': 3,
+            f'/api/v1/titles/{title_id}/reviews/': 3,
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/': 2,
+        }
+        for url, max_queries in urls.items():
+            client.get(url)
+            with django_assert_max_num_queries(max_queries):
+                response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что при GET запросе `{url}` '
+                'возвращается статус 200'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_filter_choices_cache(self, client, admin_client):
+        create_titles(admin_client)
+        client.get('/api/v1/titles/?genre=horror')
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'}
+        )
+        response = client.get('/api/v1/titles/?genre=western')
+        assert response.status_code == 200, (
+            'Проверьте, что после создания жанра по нему можно '
+            'фильтровать `/api/v1/titles/`'
+        )
+        admin_client.delete('/api/v1/genres/western/')
+        response = client.get('/api/v1/titles/?genre=western')
+        assert response.status_code == 400, (
+            'Проверьте, что после удаления жанра фильтр по нему '
+            '`/api/v1/titles/` возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_create_queries(
+        self, admin_client, user_client, django_assert_max_num_queries
+    ):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Текст', 'score': 5}
+        with django_assert_max_num_queries(6) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == 201, (
+            f'Проверьте, что при POST запросе `{url}` возвращается статус 201'
+        )
+        assert sum(
+            'FROM "reviews_title"' in query['sql']
+            for query in context.captured_queries
+        ) == 1, (
+            'Проверьте, что при создании отзыва произведение '
+            'запрашивается один раз'
+        )
+        response = user_client.post(url, data=data)
+        assert response.status_code == 400 and response.json() == {
+            'non_field_errors': [
+                'Нельзя добавить второй отзыв на то же самое произведение.'
+            ]
+        }, (
+            'Проверьте, что повторный отзыв на произведение '
+            'возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_comments_check_title(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = (
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}'
+            '/comments/'
+        )
+        response = client.get(url)
+        assert response.status_code == 404, (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/'
+            'reviews/{review_id}/comments/` с отзывом другого произведения '
+            'возвращается статус 404'
+        )
+        response = admin_client.post(url, data={'text': 'Текст'})
+        assert response.status_code == 404, (
+            'Проверьте, что при POST запросе `/api/v1/titles/{title_id}/'
+            'reviews/{review_id}/comments/` с отзывом другого произведения '
+            'возвращается статус 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_explain_api(self, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        out = StringIO()
+        call_command(
+            'explain_api',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/',
+            stdout=out,
+        )
+        output = out.getvalue()
+        assert output.count('[200]') == 2, (
+            'Проверьте, что команда `explain_api` выполняет запросы к API'
+        )
+        assert 'SCAN' not in output and 'TEMP B-TREE' not in output, (
+            'Проверьте, что списки отзывов и комментариев читаются по '
+            'индексам без полного просмотра таблиц и сортировки'
+        )
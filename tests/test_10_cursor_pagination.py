@@ -0,0 +1,76 @@
+import pytest
+
+from .common import create_reviews
+
+
+def walk(client, url, key='next'):
+    results = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсора `/api/v1/titles/` '
+            'не считает общее количество записей'
+        )
+        results.extend(data['results'])
+        url = data[key]
+    return results
+
+
+class Test10CursorPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cursor_matches_offset(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        for year in range(1990, 1995):
+            admin_client.post('/api/v1/titles/', data={
+                'name': 'Поворот туда', 'year': year,
+                'genre': titles[0]['genre'], 'category': titles[0]['category'],
+            })
+        for ordering in ('', 'name', '-year', 'rating', '-rating,name'):
+            fields = [
+                field.lstrip('-') for field in (ordering or '-rating,name')
+                .split(',')
+            ]
+            expected = client.get(
+                f'/api/v1/titles/?ordering={ordering}'
+            ).json()['results']
+            expected_ids = [title['id'] for title in expected]
+            pages = walk(
+                client, f'/api/v1/titles/?ordering={ordering}&cursor=&limit=2'
+            )
+            assert sorted(title['id'] for title in pages) == sorted(
+                expected_ids
+            ) and [
+                [title[field] for field in fields] for title in pages
+            ] == [
+                [title[field] for field in fields] for title in expected
+            ], (
+                'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+                f'с сортировкой `{ordering}` возвращает те же произведения '
+                'и в том же порядке, что и постраничная'
+            )
+            last_page = client.get(
+                f'/api/v1/titles/?ordering={ordering}&cursor=&limit=2'
+            ).json()
+            while last_page['next']:
+                last_page = client.get(last_page['next']).json()
+            backwards = walk(client, last_page['previous'], key='previous')
+            backwards_ids = [title['id'] for title in backwards]
+            assert sorted(backwards_ids) == sorted(
+                expected_ids[:-len(last_page['results'])]
+            ), (
+                'Проверьте, что ссылка `previous` курсорной пагинации '
+                'возвращает предыдущие страницы'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=invalid')
+        assert response.status_code == 404, (
+            'Проверьте, что при неверном курсоре `/api/v1/titles/` '
+            'возвращается статус 404'
+        )
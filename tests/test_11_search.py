@@ -0,0 +1,43 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test11TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/?search=ПОВОРОТ')
+        assert response.status_code == 200, (
+            'Проверьте, что при GET запросе `/api/v1/titles/?search=` '
+            'возвращается статус 200'
+        )
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что параметр `search` `/api/v1/titles/` ищет '
+            'по названию без учёта регистра'
+        )
+        data = client.get('/api/v1/titles/?search=драм').json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id']
+        ], (
+            'Проверьте, что параметр `search` `/api/v1/titles/` ищет '
+            'по началу слов в описании'
+        )
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Поворот'}
+        )
+        data = client.get('/api/v1/titles/?search=поворот').json()
+        assert data['count'] == 2, (
+            'Проверьте, что поисковый индекс обновляется '
+            'при изменении произведения'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        data = client.get('/api/v1/titles/?search=поворот').json()
+        assert data['count'] == 1, (
+            'Проверьте, что поисковый индекс обновляется '
+            'при удалении произведения'
+        )
@@ -0,0 +1,42 @@
+import pytest
+
+from .common import auth_client, create_titles
+
+
+class Test12ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_lists(
+        self, client, admin_client, user, django_assert_num_queries
+    ):
+        titles, _, _ = create_titles(admin_client)
+        for url in (
+            '/api/v1/titles/?year=2000&genre=horror',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+        ):
+            expected = client.get(url).json()
+            with django_assert_num_queries(0):
+                response = client.get(url)
+            assert response.json() == expected, (
+                f'Проверьте, что повторный GET запрос `{url}` '
+                'отдаётся из кеша без запросов к базе данных'
+            )
+
+        auth_client(user).post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отлично', 'score': 9}
+        )
+        data = client.get('/api/v1/titles/?year=2000&genre=horror').json()
+        assert data['results'][0]['rating'] == 9, (
+            'Проверьте, что создание отзыва сбрасывает кеш '
+            'списка `/api/v1/titles/`'
+        )
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'}
+        )
+        data = client.get('/api/v1/categories/').json()
+        assert data['count'] == 3, (
+            'Проверьте, что создание категории сбрасывает кеш '
+            'списка `/api/v1/categories/`'
+        )
@@ -0,0 +1,74 @@
+import pytest
+
+from .common import create_comments
+
+
+class Test13ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_not_modified(
+        self, client, admin_client, admin, django_assert_max_num_queries
+    ):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        for url in (
+            '/api/v1/titles/', title_url, reviews_url, comments_url
+        ):
+            response = client.get(url)
+            etag = response.get('ETag')
+            assert etag and etag.startswith('W/'), (
+                f'Проверьте, что GET запрос `{url}` возвращает слабый ETag'
+            )
+            with django_assert_max_num_queries(1):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                f'Проверьте, что GET запрос `{url}` с совпадающим '
+                '`If-None-Match` возвращает статус 304 без запроса списка'
+            )
+
+        etag = client.get(comments_url).get('ETag')
+        admin_client.patch(
+            f'{comments_url}{comments[0]["id"]}/', data={'text': 'Новый'}
+        )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение комментария меняет ETag списка '
+            '`/api/v1/titles/{title_id}/reviews/{review_id}/comments/`'
+        )
+
+        etag = client.get(reviews_url).get('ETag')
+        admin_client.patch(
+            f'{reviews_url}{reviews[0]["id"]}/', data={'text': 'Новый'}
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение отзыва меняет ETag списка '
+            '`/api/v1/titles/{title_id}/reviews/`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_author_rename(self, client, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        etags = {
+            url: client.get(url).get('ETag')
+            for url in (reviews_url, comments_url)
+        }
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        assert response.status_code == 200
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                'Проверьте, что смена имени автора меняет ETag списка '
+                f'`{url}`'
+            )
+            assert 'renamed' in {
+                item['author'] for item in response.json()['results']
+            }
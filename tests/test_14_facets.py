@@ -0,0 +1,46 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test14Facets:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_facets(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/facets/')
+        assert response.status_code == 200, (
+            'Проверьте, что при GET запросе `/api/v1/titles/facets/` '
+            'возвращается статус 200'
+        )
+        data = response.json()
+        assert {item['slug']: item['count'] for item in data['genre']} == {
+            'horror': 1, 'comedy': 1, 'drama': 1
+        }, (
+            'Проверьте, что `/api/v1/titles/facets/` возвращает '
+            'количество произведений по жанрам'
+        )
+        assert data['year'] == [
+            {'year': 2000, 'count': 1}, {'year': 2020, 'count': 1}
+        ], (
+            'Проверьте, что `/api/v1/titles/facets/` возвращает '
+            'количество произведений по годам'
+        )
+
+        data = client.get('/api/v1/titles/facets/?category=films').json()
+        assert data['category'] == [
+            {'slug': 'films', 'name': 'Фильм', 'count': 1}
+        ], (
+            'Проверьте, что `/api/v1/titles/facets/` учитывает параметры '
+            'фильтрации произведений'
+        )
+
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Сиквел', 'year': 2000, 'genre': ['drama'],
+            'category': 'films',
+        })
+        data = client.get('/api/v1/titles/facets/?category=films').json()
+        assert data['category'][0]['count'] == 2, (
+            'Проверьте, что создание произведения сбрасывает кеш '
+            '`/api/v1/titles/facets/`'
+        )
@@ -0,0 +1,70 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIClient
+
+
+def obtain_token_client(client, user):
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == 201, (
+        'Проверьте, что POST запрос `/api/v1/auth/token/` с верным кодом '
+        'возвращает статус 201'
+    )
+    token_client = APIClient()
+    token_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+    )
+    return token_client
+
+
+class Test15StatelessAuth:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_no_user_query(
+        self, client, admin, django_assert_num_queries
+    ):
+        admin_client = obtain_token_client(client, admin)
+        admin_client.get('/api/v1/users/')
+        with django_assert_num_queries(2):
+            response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 200, (
+            'Проверьте, что токен из `/api/v1/auth/token/` дает доступ '
+            'к `/api/v1/users/`'
+        )
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильмы', 'slug': 'films'}
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что роль администратора берется из токена'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change_revokes_token(self, client, admin, user):
+        user_client = obtain_token_client(client, user)
+        title_data = {'name': 'Фильм', 'year': 2000}
+        assert user_client.get('/api/v1/users/me/').json()['email'] == (
+            user.email
+        ), (
+            'Проверьте, что `/api/v1/users/me/` возвращает полные данные '
+            'пользователя из базы'
+        )
+        user.role = 'admin'
+        user.save()
+        response = user_client.post('/api/v1/titles/', data=title_data)
+        assert response.status_code == 401, (
+            'Проверьте, что после смены роли старый токен отзывается'
+        )
+        user_client = obtain_token_client(client, user)
+        response = user_client.post('/api/v1/categories/', data={
+            'name': 'Книги', 'slug': 'books'
+        })
+        assert response.status_code == 201, (
+            'Проверьте, что новый токен содержит новую роль пользователя'
+        )
+        user.delete()
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 401, (
+            'Проверьте, что токен удалённого пользователя отзывается'
+        )
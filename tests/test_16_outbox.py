@@ -0,0 +1,122 @@
+import os
+from datetime import timedelta
+
+import pytest
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+
+class FailingEmailBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class Test16Outbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_enqueues_email(self, client, tmp_path):
+        from reviews.models import OutgoingEmail
+
+        for number in range(3):
+            client.post(self.url_signup, data={
+                'email': f'user{number}@yamdb.fake',
+                'username': f'user{number}',
+            })
+        assert OutgoingEmail.objects.count() == 3, (
+            f'Проверьте, что POST запрос `{self.url_signup}` ставит письмо '
+            'с кодом подтверждения в очередь'
+        )
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+            EMAIL_FILE_PATH=str(tmp_path),
+        ):
+            call_command('send_outbox', batch_size=2, verbosity=0)
+        assert not OutgoingEmail.objects.exists(), (
+            'Проверьте, что команда `send_outbox` удаляет отправленные письма'
+        )
+        files = os.listdir(tmp_path)
+        assert len(files) == 1, (
+            'Проверьте, что команда `send_outbox` отправляет письма '
+            'через одно соединение'
+        )
+        content = (tmp_path / files[0]).read_text()
+        for number in range(3):
+            assert f'user{number}@yamdb.fake' in content, (
+                'Проверьте, что команда `send_outbox` отправляет все письма'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_retry_with_backoff(self, client, tmp_path):
+        from reviews.models import OutgoingEmail
+
+        client.post(self.url_signup, data={
+            'email': 'user@yamdb.fake', 'username': 'user',
+        })
+        with override_settings(
+            EMAIL_BACKEND='tests.test_16_outbox.FailingEmailBackend'
+        ):
+            call_command('send_outbox', verbosity=0)
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1 and email.last_error, (
+            'Проверьте, что неотправленное письмо остаётся в очереди '
+            'с увеличенным счётчиком попыток'
+        )
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повторная попытка отправки откладывается'
+        )
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+            EMAIL_FILE_PATH=str(tmp_path / 'sent'),
+        ):
+            call_command('send_outbox', verbosity=0)
+            assert OutgoingEmail.objects.exists(), (
+                'Проверьте, что письмо не отправляется до следующей попытки'
+            )
+            OutgoingEmail.objects.update(
+                next_attempt_at=timezone.now() - timedelta(seconds=1)
+            )
+            call_command('send_outbox', verbosity=0)
+        assert not OutgoingEmail.objects.exists(), (
+            'Проверьте, что письмо отправляется при повторной попытке'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_claimed_emails(self, client, tmp_path):
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import CLAIM_TIMEOUT, MAX_ATTEMPTS, claim_batch
+
+        for number in range(3):
+            client.post(self.url_signup, data={
+                'email': f'user{number}@yamdb.fake',
+                'username': f'user{number}',
+            })
+        _, first = claim_batch(MAX_ATTEMPTS, 0, 2, 'first')
+        _, second = claim_batch(MAX_ATTEMPTS, 0, 2, 'second')
+        assert len(first) == 2 and len(second) == 1, (
+            'Проверьте, что письмо берёт в отправку только один процесс'
+        )
+        assert not {email.id for email in first} & {
+            email.id for email in second
+        }
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+            EMAIL_FILE_PATH=str(tmp_path),
+        ):
+            call_command('send_outbox', verbosity=0)
+            assert OutgoingEmail.objects.count() == 3, (
+                'Проверьте, что `send_outbox` не отправляет письма, '
+                'взятые в отправку другим процессом'
+            )
+            OutgoingEmail.objects.filter(claim_token='first').update(
+                claimed_at=timezone.now() - CLAIM_TIMEOUT
+                - timedelta(seconds=1)
+            )
+            call_command('send_outbox', verbosity=0)
+        assert OutgoingEmail.objects.count() == 1, (
+            'Проверьте, что письма, не отправленные за CLAIM_TIMEOUT, '
+            'снова доступны для отправки'
+        )
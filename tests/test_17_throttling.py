@@ -0,0 +1,55 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test17Throttling:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_throttled(self, client):
+        from api.throttling import get_bucket_store
+
+        statuses = [
+            client.post('/api/v1/auth/signup/', data={}).status_code
+            for _ in range(6)
+        ]
+        assert statuses == [400] * 5 + [429], (
+            'Проверьте, что POST запросы `/api/v1/auth/signup/` '
+            'ограничиваются по частоте'
+        )
+        response = client.post('/api/v1/auth/signup/', data={})
+        assert 0 < int(response['Retry-After']) <= 12, (
+            'Проверьте, что ответ 429 содержит время до пополнения корзины'
+        )
+        get_bucket_store().clear()
+        response = client.post('/api/v1/auth/token/', data={})
+        assert response.status_code == 400, (
+            'Проверьте, что у `/api/v1/auth/token/` своя корзина'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_create_throttled(
+        self, admin_client, user_client, monkeypatch
+    ):
+        from api.throttling import ScopedTokenBucketThrottle
+
+        titles, _, _ = create_titles(admin_client)
+        monkeypatch.setitem(
+            ScopedTokenBucketThrottle.THROTTLE_RATES, 'reviews', '1/min'
+        )
+        statuses = [
+            user_client.post(
+                f'/api/v1/titles/{title["id"]}/reviews/',
+                data={'text': 'Отлично', 'score': 9}
+            ).status_code
+            for title in titles
+        ]
+        assert statuses == [201, 429], (
+            'Проверьте, что создание отзывов ограничивается по частоте'
+        )
+        response = user_client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что чтение отзывов не ограничивается'
+        )
@@ -0,0 +1,145 @@
+import csv
+import os
+import shutil
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+
+
+def csv_rows(file_name):
+    path = os.path.join(settings.BASE_DIR, 'static', 'data', file_name)
+    with open(path, encoding='utf-8') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+class Test18LoadData:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_load_data_in_batches(self):
+        from reviews.models import Comment, Review, Title
+
+        call_command('load_data', batch_size=7, verbosity=0)
+        call_command('load_data', batch_size=7, verbosity=0)
+        for model, file_name in (
+            (Title, 'titles.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        ):
+            assert model.objects.count() == len(csv_rows(file_name)), (
+                f'Проверьте, что команда `load_data` загружает все строки '
+                f'файла {file_name}'
+            )
+        reviews = csv_rows('review.csv')
+        title_id = reviews[0]['title_id']
+        scores = [
+            int(review['score']) for review in reviews
+            if review['title_id'] == title_id
+        ]
+        assert Title.objects.get(pk=title_id).rating == pytest.approx(
+            sum(scores) / len(scores)
+        ), (
+            'Проверьте, что после загрузки отзывов `load_data` '
+            'пересчитывает рейтинг произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_upsert(self, tmp_path):
+        from reviews.models import Review, Title
+
+        call_command('load_data', verbosity=0)
+        data_dir = os.path.join(settings.BASE_DIR, 'static', 'data')
+        for file_name in os.listdir(data_dir):
+            shutil.copy(os.path.join(data_dir, file_name), tmp_path)
+        reviews = csv_rows('review.csv')
+        changed, removed = reviews[0], reviews[1]
+        changed['score'] = '1'
+        with open(tmp_path / 'review.csv', 'w', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=list(changed))
+            writer.writeheader()
+            writer.writerows(
+                review for review in reviews if review is not removed
+            )
+        untouched = Title.objects.exclude(
+            pk__in=[changed['title_id'], removed['title_id']]
+        ).first()
+
+        call_command(
+            'load_data', upsert=True, delete_missing=True,
+            data_dir=str(tmp_path), verbosity=0,
+        )
+        assert Review.objects.get(pk=changed['id']).score == 1, (
+            'Проверьте, что `load_data --upsert` обновляет изменённые строки'
+        )
+        assert not Review.objects.filter(pk=removed['id']).exists(), (
+            'Проверьте, что `load_data --upsert --delete-missing` удаляет '
+            'строки, которых нет в CSV'
+        )
+        title = Title.objects.get(pk=changed['title_id'])
+        scores = Review.objects.filter(title=title).values_list(
+            'score', flat=True
+        )
+        assert title.rating == pytest.approx(sum(scores) / len(scores)), (
+            'Проверьте, что `load_data --upsert` пересчитывает рейтинг '
+            'затронутых произведений'
+        )
+        assert Title.objects.get(pk=untouched.pk).changed_at == (
+            untouched.changed_at
+        ), (
+            'Проверьте, что `load_data --upsert` не изменяет записи, '
+            'которые не изменились в CSV'
+        )
+
+    def test_03_dependency_order(self):
+        from reviews.management.commands.load_data import (
+            TABLES, dependency_order
+        )
+
+        models = [model for model, _ in dependency_order(TABLES[::-1])]
+        for model in models:
+            for field in model._meta.concrete_fields:
+                if field.is_relation and field.related_model in models:
+                    assert models.index(field.related_model) < models.index(
+                        model
+                    ), (
+                        'Проверьте, что таблицы загружаются после таблиц, '
+                        'на которые ссылаются'
+                    )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_invalid_row(self, tmp_path):
+        data_dir = os.path.join(settings.BASE_DIR, 'static', 'data')
+        for file_name in os.listdir(data_dir):
+            shutil.copy(os.path.join(data_dir, file_name), tmp_path)
+        titles = csv_rows('titles.csv')
+        titles[-1]['year'] = 'не год'
+        with open(tmp_path / 'titles.csv', 'w', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=list(titles[0]))
+            writer.writeheader()
+            writer.writerows(titles)
+        with pytest.raises(CommandError, match=f'Строка {len(titles) + 1}'):
+            call_command(
+                'load_data', data_dir=str(tmp_path), workers=2, verbosity=0
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_spawn_workers(self):
+        import multiprocessing
+
+        from reviews.models import Comment, User
+
+        start_method = multiprocessing.get_start_method()
+        multiprocessing.set_start_method('spawn', force=True)
+        try:
+            call_command('load_data', workers=2, verbosity=0)
+        finally:
+            multiprocessing.set_start_method(start_method, force=True)
+        assert User.objects.count() == len(csv_rows('users.csv')), (
+            'Проверьте, что `load_data` работает с процессами, '
+            'запущенными через spawn'
+        )
+        call_command('load_data', workers=1, verbosity=0)
+        assert Comment.objects.count() == len(csv_rows('comments.csv')), (
+            'Проверьте, что `load_data --workers 1` загружает данные '
+            'без пула процессов'
+        )
@@ -0,0 +1,63 @@
+import pytest
+from django.core.management import call_command
+
+SCALE = {
+    'users': 100, 'categories': 3, 'genres': 5, 'titles': 30,
+    'reviews': 300, 'comments': 100, 'verbosity': 0,
+}
+
+
+class Test19GenerateData:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_generate_to_database(self):
+        from django.db.models import Count, Sum
+
+        from reviews.models import Comment, Review, Title, User
+
+        call_command('generate_data', **SCALE)
+        counts = (
+            User.objects.count(), Title.objects.count(),
+            Review.objects.count(), Comment.objects.count(),
+        )
+        assert counts == (100, 30, 300, 100), (
+            'Проверьте, что команда `generate_data` создаёт заданное '
+            'количество записей'
+        )
+        top = Title.objects.order_by('-reviews_count').first()
+        assert top.reviews_count > 300 / 30 * 2, (
+            'Проверьте, что популярность произведений неравномерна'
+        )
+        assert Title.objects.aggregate(
+            total=Sum('reviews_count')
+        )['total'] == 300, (
+            'Проверьте, что после `generate_data` рейтинг произведений '
+            'пересчитан'
+        )
+        assert not Review.objects.values('title', 'author').annotate(
+            count=Count('pk')
+        ).filter(count__gt=1).exists(), (
+            'Проверьте, что `generate_data` создаёт не больше одного '
+            'отзыва пользователя на произведение'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_generate_csv(self, tmp_path):
+        from reviews.models import Review
+
+        call_command('generate_data', output_dir=str(tmp_path), **SCALE)
+        first = {
+            path.name: path.read_bytes() for path in tmp_path.iterdir()
+        }
+        call_command('generate_data', output_dir=str(tmp_path), **SCALE)
+        assert first == {
+            path.name: path.read_bytes() for path in tmp_path.iterdir()
+        }, (
+            'Проверьте, что `generate_data` с одинаковыми параметрами '
+            'порождает одинаковые данные'
+        )
+        call_command('load_data', data_dir=str(tmp_path), verbosity=0)
+        assert Review.objects.count() == 300, (
+            'Проверьте, что CSV-файлы `generate_data` загружаются '
+            'командой `load_data`'
+        )
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+class Test20Benchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_benchmark_api(self, tmp_path):
+        from api.benchmark import api_route_names
+        from reviews.models import ROLE_ADMIN, User
+
+        call_command(
+            'generate_data', users=20, categories=2, genres=3, titles=10,
+            reviews=50, comments=50, verbosity=0,
+        )
+        User.objects.filter(role=ROLE_ADMIN).delete()
+        users = User.objects.count()
+        output = tmp_path / 'benchmark.json'
+        call_command(
+            'benchmark_api', iterations=3, warmup=1, output=str(output),
+            no_latency_budget=True, verbosity=0,
+        )
+        assert User.objects.count() == users, (
+            'Проверьте, что `benchmark_api` удаляет созданных для '
+            'измерений пользователей'
+        )
+        report = json.loads(output.read_text(encoding='utf-8'))
+        results = report['results']
+        assert {result['route'] for result in results} == api_route_names(), (
+            'Проверьте, что `benchmark_api` измеряет все маршруты API'
+        )
+        for result in results:
+            assert result['status'] < 400, (
+                f'Проверьте, что сценарий `{result["name"]}` выполняется '
+                'успешно'
+            )
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+            assert result['peak_bytes'] > 0
+        assert report['dataset']['title'] == 10, (
+            'Проверьте, что `benchmark_api` не изменяет данные'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_query_budget(self, monkeypatch):
+        from api import benchmark
+
+        monkeypatch.setitem(benchmark.DEFAULT_BUDGET, 'queries', 0)
+        with pytest.raises(CommandError, match='genres-list'):
+            call_command(
+                'benchmark_api', iterations=1, warmup=0, only=['genres-list'],
+                no_latency_budget=True, verbosity=0,
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_missing_routes(self):
+        with pytest.raises(CommandError, match='Маршруты без сценариев'):
+            call_command(
+                'benchmark_api', iterations=1, warmup=0,
+                no_latency_budget=True, verbosity=0,
+            )
@@ -0,0 +1,52 @@
+import pytest
+from django.test import Client, override_settings
+
+
+class Test21Middleware:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_api_skips_browser_middleware(self, client, admin_client):
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert not hasattr(response.wsgi_request, 'session'), (
+            'Проверьте, что запросы к API не проходят SessionMiddleware'
+        )
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'}
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что запросы к API с JWT работают без '
+            'сессий и CSRF'
+        )
+        response = client.get('/api/v1/categories/', HTTP_ACCEPT='text/html')
+        assert response.status_code == 200, (
+            'Проверьте, что браузерная версия API открывается без '
+            'сессий и сообщений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_admin_keeps_full_stack(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.get('/admin/login/')
+        assert response.status_code == 200
+        assert hasattr(response.wsgi_request, 'session'), (
+            'Проверьте, что админка проходит SessionMiddleware'
+        )
+        assert 'csrftoken' in response.cookies, (
+            'Проверьте, что админка проходит CsrfViewMiddleware'
+        )
+        response = client.post(
+            '/admin/login/', {'username': 'admin', 'password': 'admin'}
+        )
+        assert response.status_code == 403, (
+            'Проверьте, что админка проверяет CSRF-токен'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_full_stack_setting(self, client):
+        with override_settings(LEAN_MIDDLEWARE_PATHS=()):
+            response = client.get('/api/v1/categories/')
+        assert hasattr(response.wsgi_request, 'session'), (
+            'Проверьте, что пустой `LEAN_MIDDLEWARE_PATHS` включает полную '
+            'цепочку middleware для API'
+        )
@@ -0,0 +1,78 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+class Test22Schema:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_openapi_json(self, client):
+        response = client.get('/openapi.json')
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response
+        schema = json.loads(response.content)
+        assert schema['basePath'] == '/api/v1'
+        assert '/titles/' in schema['paths'], (
+            'Проверьте, что `/openapi.json` отдаёт схему API'
+        )
+        assert '/titles/{title_id}/reviews/' in schema['paths']
+        assert 'host' not in schema, (
+            'Проверьте, что схема не привязана к хосту запроса'
+        )
+        etag = response['ETag']
+        response = client.get('/openapi.json', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что `/openapi.json` отвечает 304 на If-None-Match '
+            'с текущим ETag'
+        )
+        compressed = client.get(
+            '/openapi.json', HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        assert compressed['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(compressed.content) == client.get(
+            '/openapi.json'
+        ).content, (
+            'Проверьте, что `/openapi.json` отдаёт ту же схему в gzip'
+        )
+        page = client.get('/swagger/')
+        assert page.status_code == 200
+        assert b'/openapi.json' in page.content, (
+            'Проверьте, что Swagger UI загружает готовую схему'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_build_schema(self, client, tmp_path):
+        path = tmp_path / 'openapi.json'
+        call_command('build_schema', output=str(path), verbosity=0)
+        assert path.read_bytes() == client.get('/openapi.json').content, (
+            'Проверьте, что `build_schema` записывает ту же схему, что '
+            'отдаёт `/openapi.json`'
+        )
+        call_command('build_schema', output=str(path), check=True,
+                     verbosity=0)
+        path.write_text('{}')
+        with pytest.raises(CommandError):
+            call_command('build_schema', output=str(path), check=True,
+                         verbosity=0)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_swagger_page_without_generator(self, client, monkeypatch):
+        from api_yamdb.schema import SchemaGenerator
+
+        client.get('/openapi.json')
+        calls = []
+        monkeypatch.setattr(
+            SchemaGenerator, 'get_schema',
+            lambda *args, **kwargs: calls.append(args),
+        )
+        for _ in range(3):
+            page = client.get('/swagger/')
+            assert page.status_code == 200
+            assert b'YaMDb API' in page.content
+        assert not calls, (
+            'Проверьте, что страница `/swagger/` не строит схему API '
+            'на каждый запрос'
+        )
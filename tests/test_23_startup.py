@@ -0,0 +1,63 @@
+import importlib
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import clear_url_caches
+
+
+class Test23Startup:
+
+    def test_01_lazy_urlconfs(self, tmp_path):
+        output = tmp_path / 'startup.json'
+        call_command('startup_report', output=str(output), verbosity=0)
+        report = json.loads(output.read_text(encoding='utf-8'))
+        modules = {
+            phase['name']: set(phase['modules'])
+            for phase in report['phases']
+        }
+        startup = modules['setup'] | modules['urlconf'] | modules[
+            'first_request'
+        ]
+        for module in ('api_yamdb.docs_urls', 'drf_yasg.views',
+                       'api_yamdb.admin_urls', 'reviews.admin'):
+            assert module not in startup, (
+                f'Проверьте, что `{module}` не импортируется до первого '
+                'ответа API'
+            )
+        assert {'api_yamdb.docs_urls', 'drf_yasg.views'} <= modules[
+            '/swagger/'
+        ], (
+            'Проверьте, что URLconf документации загружается при первом '
+            'запросе к ней'
+        )
+        assert {'api_yamdb.admin_urls', 'reviews.admin'} <= modules[
+            '/admin/'
+        ], (
+            'Проверьте, что админка загружается при первом запросе к ней'
+        )
+        assert report['startup_ms'] > 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_disable_docs_and_admin(self, client):
+        from api_yamdb import urls
+
+        try:
+            with override_settings(ENABLE_API_DOCS=False,
+                                   ENABLE_ADMIN=False):
+                importlib.reload(urls)
+                clear_url_caches()
+                assert client.get('/swagger/').status_code == 404, (
+                    'Проверьте, что `ENABLE_API_DOCS = False` отключает '
+                    'документацию'
+                )
+                assert client.get('/admin/login/').status_code == 404, (
+                    'Проверьте, что `ENABLE_ADMIN = False` отключает '
+                    'админку'
+                )
+                assert client.get('/api/v1/').status_code == 200
+        finally:
+            importlib.reload(urls)
+            clear_url_caches()
+        assert client.get('/swagger/').status_code == 200
@@ -0,0 +1,82 @@
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.test import override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+DATA = {
+    'results': [{
+        'id': 1,
+        'name': 'Фильм с разделителем',
+        'pub_date': datetime(2022, 1, 2, 3, 4, 5, 678000, timezone.utc),
+        'rating': Decimal('7.50'),
+        'score': 7.5,
+        'genre': [],
+        'description': None,
+        'detail': gettext_lazy('Страница не найдена.'),
+    }],
+    'count': 2 ** 70,
+}
+
+
+class Test24JSONRenderer:
+
+    def test_01_render_matches_json_renderer(self):
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA
+        ), (
+            'Проверьте, что FastJSONRenderer отдаёт тот же ответ, '
+            'что JSONRenderer'
+        )
+        data = dict(DATA, count=2)
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(
+            data
+        )
+        context = {'indent': 4}
+        assert FastJSONRenderer().render(
+            data, 'application/json', context
+        ) == JSONRenderer().render(data, 'application/json', context), (
+            'Проверьте, что ответ с отступами совпадает с JSONRenderer'
+        )
+        with override_settings(API_JSON_BACKEND='json'):
+            assert FastJSONRenderer().render(data) == JSONRenderer().render(
+                data
+            )
+
+    def test_02_parse_matches_json_parser(self):
+        content = '{"text": "Отзыв", "score": 10, "tags": [1.5, null]}'
+        assert FastJSONParser().parse(
+            io.BytesIO(content.encode())
+        ) == JSONParser().parse(io.BytesIO(content.encode()))
+        with pytest.raises(ParseError) as fast_error:
+            FastJSONParser().parse(io.BytesIO(b'{"text": '))
+        with pytest.raises(ParseError) as error:
+            JSONParser().parse(io.BytesIO(b'{"text": '))
+        assert str(fast_error.value) == str(error.value), (
+            'Проверьте, что сообщение об ошибочном JSON не изменилось'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_api_uses_fast_renderer(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'},
+            format='json',
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что API принимает JSON через FastJSONParser'
+        )
+        response = admin_client.get('/api/v1/categories/')
+        assert isinstance(
+            response.accepted_renderer, FastJSONRenderer
+        ), 'Проверьте, что API отвечает через FastJSONRenderer'
+        assert response.json()['results'] == [
+            {'name': 'Фильм', 'slug': 'films'}
+        ]
@@ -0,0 +1,84 @@
+import logging
+import re
+
+import pytest
+from django.test import override_settings
+
+SERVER_TIMING = re.compile(
+    r'^total;dur=([\d.]+), db;dur=([\d.]+);desc="(\d+) queries", '
+    r'serialize;dur=([\d.]+), render;dur=([\d.]+)$'
+)
+
+
+class RecordsHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def timing_records():
+    handler = RecordsHandler()
+    logger = logging.getLogger('api_yamdb.timing')
+    logger.addHandler(handler)
+    yield handler.records
+    logger.removeHandler(handler)
+
+
+class Test25RequestTiming:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_server_timing(self, admin_client):
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'}
+        )
+        response = admin_client.get('/api/v1/categories/')
+        match = SERVER_TIMING.match(response.get('Server-Timing', ''))
+        assert match, (
+            'Проверьте, что ответ содержит заголовок Server-Timing с '
+            'этапами total, db, serialize и render'
+        )
+        total, db, queries, serialize, render = match.groups()
+        assert int(queries) > 0, (
+            'Проверьте, что Server-Timing содержит число SQL-запросов'
+        )
+        assert float(total) >= float(db) + float(serialize), (
+            'Проверьте, что время сериализации не включает SQL-запросы'
+        )
+        with override_settings(SERVER_TIMING_HEADER=False):
+            response = admin_client.get('/api/v1/categories/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что SERVER_TIMING_HEADER = False отключает '
+            'заголовок'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_log_line(self, admin_client, client, timing_records):
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'}
+        )
+        admin_client.get('/api/v1/categories/')
+        client.get('/api/v1/titles/facets/')
+        client.get('/api/v1/unknown/')
+        assert [record.view for record in timing_records] == [
+            'CategoryViewSet.create', 'CategoryViewSet.list',
+            'TitleViewSet.facets', None,
+        ], (
+            'Проверьте, что строка журнала api_yamdb.timing содержит '
+            'viewset и action'
+        )
+        create, listing = timing_records[:2]
+        assert create.status == 201 and create.method == 'POST'
+        assert create.queries > 0 and create.serialize_ms >= 0
+        assert listing.getMessage().startswith(
+            'view=CategoryViewSet.list method=GET '
+            'path=/api/v1/categories/ status=200 total_ms='
+        )
+        for name in ('db_ms', 'queries', 'serialize_ms', 'render_ms'):
+            assert f' {name}=' in listing.getMessage(), (
+                f'Проверьте, что строка журнала содержит {name}'
+            )